@@ -338,6 +338,40 @@ class CheckChromFile(argparse.Action):
 # Check file extension and format
 # ---------------------------------------------------------------
 
+# File extensions are checked using the following regular expressions.
+# They are compiled only once (at import).
+
+fasta_format_1 = '(\.[Ff][Aa][Ss][Tt][Aa]$)|(\.[Ff][Nn][Aa]$)'
+fasta_format_2 = '|(\.[Ff][Aa]$)|(\.[Ff][Aa][Ss]$)|(\.[Ff][Ff][Nn]$)|(\.[Ff][Rr][Nn]$)'
+fasta_regexp = fasta_format_1 + fasta_format_2
+fasta_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", fasta_regexp)
+bed_regexp = '\.[Bb][Ee][Dd][3456]{0,1}$'
+bed_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", bed_regexp)
+gtf_regexp = '\.[Gg][Tt][Ff]$'
+gtf_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", gtf_regexp)
+tsv_regexp = '\.[Tt][Ss][Vv]$'
+txt_regexp = '(\.[Tt][Xx][Tt]$)|(\.[Cc][Ss][Vv]$)|(\.[Dd][Ss][Vv]$)|(\.[Tt][Aa][Bb]$)|(\.[Tt][Ss][Vv]$)'
+txt_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", txt_regexp)
+bigwig_regexp = '(\.[Bb][Ww]$)|(\.[Bb][Ii][Gg][Ww][Ii][Gg]$)'
+zip_regexp = '\.[Zz][Ii][Pp]$'
+pdf_regexp = '\.[Pp][Dd][Ff]$'
+
+_ext2regexp = {'bed': bed_regexp,
+               'bed.gz': bed_regexp_gz,
+               'gtf': gtf_regexp,
+               'gtf.gz': gtf_regexp_gz,
+               'fasta': fasta_regexp,
+               'fasta.gz': fasta_regexp_gz,
+               'txt': txt_regexp,
+               'tsv': tsv_regexp,
+               'txt.gz': txt_regexp_gz,
+               'bigwig': bigwig_regexp,
+               'zip': zip_regexp,
+               'pdf': pdf_regexp}
+
+_ext2regexp_compiled = {k: re.compile(v) for k, v in _ext2regexp.items()}
+
+
 class FormattedFile(argparse.FileType):
     """
     Check file extensions and format.
@@ -358,34 +392,6 @@ class FormattedFile(argparse.FileType):
         # Check file extension
         # ---------------------------------------------------------------
 
-        fasta_format_1 = '(\.[Ff][Aa][Ss][Tt][Aa]$)|(\.[Ff][Nn][Aa]$)'
-        fasta_format_2 = '|(\.[Ff][Aa]$)|(\.[Ff][Aa][Ss]$)|(\.[Ff][Ff][Nn]$)|(\.[Ff][Rr][Nn]$)'
-        fasta_regexp = fasta_format_1 + fasta_format_2
-        fasta_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", fasta_regexp)
-        bed_regexp = '\.[Bb][Ee][Dd][3456]{0,1}$'
-        bed_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", bed_regexp)
-        gtf_regexp = '\.[Gg][Tt][Ff]$'
-        gtf_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", gtf_regexp)
-        tsv_regexp = '\.[Tt][Ss][Vv]$'
-        txt_regexp = '(\.[Tt][Xx][Tt]$)|(\.[Cc][Ss][Vv]$)|(\.[Dd][Ss][Vv]$)|(\.[Tt][Aa][Bb]$)|(\.[Tt][Ss][Vv]$)'
-        txt_regexp_gz = re.sub("\$", "\.[Gg][Zz]$", txt_regexp)
-        bigwig_regexp = '(\.[Bb][Ww]$)|(\.[Bb][Ii][Gg][Ww][Ii][Gg]$)'
-        zip_regexp = '\.[Zz][Ii][Pp]$'
-        pdf_regexp = '\.[Pp][Dd][Ff]$'
-
-        ext2regexp = {'bed': bed_regexp,
-                      'bed.gz': bed_regexp_gz,
-                      'gtf': gtf_regexp,
-                      'gtf.gz': gtf_regexp_gz,
-                      'fasta': fasta_regexp,
-                      'fasta.gz': fasta_regexp_gz,
-                      'txt': txt_regexp,
-                      'tsv': tsv_regexp,
-                      'txt.gz': txt_regexp_gz,
-                      'bigwig': bigwig_regexp,
-                      'zip': zip_regexp,
-                      'pdf': pdf_regexp}
-
         # Set verbosity system wide as depending on
         # command line argument order, VERBOSITY (-V) can
         # be evaluated later...
@@ -405,13 +411,13 @@ class FormattedFile(argparse.FileType):
             extension_list = list(self.file_ext)
 
         for this_ext in extension_list:
-            if re.search(ext2regexp[this_ext], string):
+            if _ext2regexp_compiled[this_ext].search(string):
                 match = True
                 break
 
         if not match:
             message('Not a valid filename extension :' + string, type="WARNING")
-            message('Extension expected: ' + ext2regexp[this_ext], type="ERROR")
+            message('Extension expected: ' + _ext2regexp[this_ext], type="ERROR")
             sys.exit()
 
         # ---------------------------------------------------------------
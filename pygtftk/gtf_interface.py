@@ -9,6 +9,7 @@ When using gtfk a GTF object methods may return:
 
 """
 
+import csv
 import gc
 import glob
 import io
@@ -20,6 +21,7 @@ from collections import OrderedDict
 from collections import defaultdict
 
 import numpy as np
+import pandas as pd
 from cffi import FFI
 from nose.plugins.skip import SkipTest
 from pybedtools.bedtool import BedTool
@@ -42,7 +44,6 @@ from pygtftk.fasta_interface import FASTA
 from pygtftk.tab_interface import TAB
 from pygtftk.utils import GTFtkError
 from pygtftk.utils import check_file_or_dir_exists
-from pygtftk.utils import chomp
 from pygtftk.utils import chrom_info_to_bed_file
 from pygtftk.utils import flatten_list_recur
 from pygtftk.utils import make_tmp_file
@@ -59,6 +60,31 @@ def native_str(x):
     return bytes(x.encode())
 
 
+# BED files produced from chromInfo files by get_intergenic(). Keys are
+# (path, modification time, chr_list).
+_CHROM_BED_CACHE = dict()
+
+# Names of the basic attributes accepted by Feature.get_attr_value() and
+# their counterpart in extract_data().
+_FEATURE_KEY_ALIASES = {'chrom': 'seqid',
+                        'seqname': 'seqid',
+                        'ft_type': 'feature',
+                        'src': 'source',
+                        'frame': 'phase'}
+
+
+def _na_bytes(no_na=False, hide_undef=False):
+    """Returns the set of undefined ('?') and/or unset ('.') values as bytes
+    (i.e. as returned by ffi.string) so that they can be discarded before
+    decoding."""
+    na_values = set()
+    if no_na:
+        na_values.add(b".")
+    if hide_undef:
+        na_values.add(b"?")
+    return na_values
+
+
 # ---------------------------------------------------------------
 # find module path
 # ---------------------------------------------------------------
@@ -541,6 +567,16 @@ class GTF(object):
         else:
             self._data = new_data
 
+        # ---------------------------------------------------------------
+        # Caches for get_feature_list(nr=True) and get_gn_to_tx(). A GTF
+        # object never modifies its _data in place (methods return a new
+        # object).
+        # ---------------------------------------------------------------
+
+        self._feat_list_nr = None
+        self._gn_strand = None
+        self._tx_tss = None
+
         # ---------------------------------------------------------------
         # Add attr_basic, attr_extended and attr_all slots
         # ---------------------------------------------------------------
@@ -723,6 +759,8 @@ class GTF(object):
         >>> a_gtf = GTF(a_file)
         >>> a_list = a_gtf.merge_attr(feat="exon,transcript,CDS", keys="gene_id,transcript_id", new_key="merge").extract_data("merge", hide_undef=True, as_list=True, nr=True)
         >>> assert a_list[0] == 'G0001|G0001T002'
+        >>> b_gtf = a_gtf.merge_attr(feat="bla", keys="gene_id", new_key="transcript_id")
+        >>> assert b_gtf.extract_data("transcript_id", as_list=True) == a_gtf.extract_data("transcript_id", as_list=True)
         """
 
         if sep == "\t":
@@ -730,9 +768,19 @@ class GTF(object):
 
         if new_key in self.get_attr_list(add_basic=False, as_dict=True):
 
+            # Nothing to merge if the key is updated with its own value(s)
+            # or if none of the target features is found. The values are
+            # kept but the key is still rewritten (i.e. moved to the end
+            # of the attributes).
+            no_update = keys == new_key
+
+            if feat != "*":
+                if not set(feat.split(",")) & set(self.get_feature_list(nr=True)):
+                    no_update = True
+
             tmp_file = make_tmp_file(prefix="merge_attr",
                                      suffix=".txt")
-            if feat == "*":
+            if feat == "*" and not no_update:
                 self.extract_data(keys,
                                   no_na=False,
                                   hide_undef=False).write(tmp_file,
@@ -744,22 +792,27 @@ class GTF(object):
 
             else:
 
-                tab = self.extract_data("feature," + keys,
-                                        no_na=False,
-                                        hide_undef=False,
-                                        as_list_of_list=True)
                 key_vals = self.extract_data(new_key,
                                              no_na=False,
                                              hide_undef=False,
                                              as_list=True)
-                feat_list = feat.split(",")
 
-                for i, j in zip(tab, key_vals):
-                    if i[0] in feat_list:
+                if no_update:
+                    tmp_file.write("".join(j + "\n" for j in key_vals))
 
-                        tmp_file.write(sep.join(i[1:]) + "\n")
-                    else:
-                        tmp_file.write(j + "\n")
+                else:
+                    tab = self.extract_data("feature," + keys,
+                                            no_na=False,
+                                            hide_undef=False,
+                                            as_list_of_list=True)
+                    feat_list = feat.split(",")
+
+                    for i, j in zip(tab, key_vals):
+                        if i[0] in feat_list:
+
+                            tmp_file.write(sep.join(i[1:]) + "\n")
+                        else:
+                            tmp_file.write(j + "\n")
 
                 tmp_file.close()
 
@@ -1054,7 +1107,7 @@ class GTF(object):
             for _, i in enumerate(x):
                 try:
                     # Converting to one base
-                    x_int += [int(i)]
+                    x_int.append(int(i))
                 except:
                     raise GTFtkError("Need a list of integers")
 
@@ -1234,26 +1287,20 @@ class GTF(object):
                                          base,
                                          nr)
             res_list = list()
+            na_values = _na_bytes(no_na, hide_undef)
+            to_str = ffi.string
+            data = ptr.data
+            nb_cols = ptr.nb_columns
 
             for i in range(ptr.nb_rows):
-                sub = list()
-                for j in range(ptr.nb_columns):
-                    sub.append(ffi.string(ptr.data[i][j]).decode())
-
-                if no_na:
-                    if "." not in sub:
-                        if hide_undef:
-                            if "?" not in sub:
-                                res_list.append(sub)
-                        else:
-                            res_list.append(sub)
+                # Values are tested as bytes so that discarded rows
+                # are never decoded.
+                sub = [to_str(x) for x in data[i][0:nb_cols]]
 
-                else:
-                    if hide_undef:
-                        if "?" not in sub:
-                            res_list.append(sub)
-                    else:
-                        res_list.append(sub)
+                if na_values and not na_values.isdisjoint(sub):
+                    continue
+
+                res_list.append([x.decode() for x in sub])
 
             return res_list
 
@@ -1266,16 +1313,11 @@ class GTF(object):
                                          base,
                                          nr)
 
-            res_list = [
-                ffi.string(x[0]).decode() for x in list(
-                    ptr.data[
-                    0:ptr.nb_rows])]
+            na_values = _na_bytes(no_na, hide_undef)
 
-            if hide_undef:
-                res_list = [x for x in res_list if x != "?"]
-
-            if no_na:
-                res_list = [x for x in res_list if x != "."]
+            res_list = [x.decode() for x in
+                        (ffi.string(y[0]) for y in ptr.data[0:ptr.nb_rows])
+                        if x not in na_values]
 
             return res_list
 
@@ -1286,13 +1328,12 @@ class GTF(object):
                                          base,
                                          nr)
 
-            res_list = [
-                ffi.string(x[0]).decode() for x in list(
-                    ptr.data[
-                    0:ptr.nb_rows])]
-
             # no_na and explicit have no effect if as_dict is requested
-            res_list = [x for x in res_list if x not in [".", "?"]]
+            na_values = _na_bytes(True, True)
+
+            res_list = [x.decode() for x in
+                        (ffi.string(y[0]) for y in ptr.data[0:ptr.nb_rows])
+                        if x not in na_values]
 
             return OrderedDict.fromkeys(res_list, default_val)
 
@@ -1339,34 +1380,34 @@ class GTF(object):
 
         elif as_dict_of_values:
 
-            tab = TAB(self.fn,
-                      self._dll.extract_data(self._data,
-                                             native_str(keys_csv),
-                                             base, 1),
-                      dll=self._dll)
+            ptr = self._dll.extract_data(self._data,
+                                         native_str(keys_csv),
+                                         base, 1)
 
-            if tab.ncols < 2:
+            if ptr.nb_columns < 2:
                 raise GTFtkError(
                     "Need at least two keys for as_dict_of_values.")
 
+            key_na = _na_bytes(True, True)
+            val_na = _na_bytes(no_na, hide_undef)
+
+            # Keys and values are compared as bytes. Only the pairs
+            # that are retained are decoded.
+            seen = set()
             res_dict = OrderedDict()
+            to_str = ffi.string
+            data = ptr.data
+
+            for i in range(ptr.nb_rows):
+                row = data[i]
+                key = to_str(row[0])
+                if key in seen or key in key_na:
+                    continue
+                val = to_str(row[1])
+                if val not in val_na:
+                    seen.add(key)
+                    res_dict[key.decode()] = val.decode()
 
-            for i in tab:
-                if i[0] not in res_dict:
-                    if i[0] != "." and i[0] != "?":
-                        if no_na:
-                            if i[1] != ".":
-                                if hide_undef:
-                                    if i[1] != "?":
-                                        res_dict[i[0]] = i[1]
-                                else:
-                                    res_dict[i[0]] = i[1]
-                        else:
-                            if hide_undef:
-                                if i[1] != "?":
-                                    res_dict[i[0]] = i[1]
-                            else:
-                                res_dict[i[0]] = i[1]
             return res_dict
 
         elif as_dict_of_merged_list:
@@ -1463,12 +1504,11 @@ class GTF(object):
                                      native_str(keys_csv), base, nr)
         nb_cols = ptr.nb_columns
         nb_rows = ptr.nb_rows
+        to_str = ffi.string
+        data = ptr.data
 
         for i in range(nb_rows):
-            l = list()
-            for j in range(nb_cols):
-                l += [ffi.string(ptr.data[i][j]).decode()]
-            yield l
+            yield [to_str(x).decode() for x in data[i][0:nb_cols]]
 
     def get_gn_strand(self):
         """Returns a dict with gene IDs as keys and strands as values.
@@ -1657,10 +1697,11 @@ class GTF(object):
             if file_with_values is not None:
                 value_list = []
                 for line in file_with_values:
-                    line = chomp(line)
-                    tokens = line.split("\t")
-                    if (col - 1) <= len(tokens):
-                        value_list += [tokens[col - 1].strip()]
+                    # Only split up to the requested column. The
+                    # trailing newline is removed by strip().
+                    tokens = line.split("\t", col)
+                    if (col - 1) < len(tokens):
+                        value_list.append(tokens[col - 1].strip())
                     else:
                         raise GTFtkError("check column number please.")
                 if len(value_list) == 0:
@@ -1784,12 +1825,12 @@ class GTF(object):
             if not invert_match:
                 if v != "?":
                     if re_comp.search(v):
-                        result += [n]
+                        result.append(n)
 
             else:
                 if v != "?":
                     if not re_comp.search(v):
-                        result += [n]
+                        result.append(n)
 
             n += 1
 
@@ -1908,19 +1949,13 @@ class GTF(object):
                                  as_list_of_list=True,
                                  nr=True, no_na=True, hide_undef=True)
 
-        gene_to_tx_max_exon = OrderedDict()
+        # One groupby pass. idxmax() returns the first transcript
+        # with the highest number of exons (ties).
+        tx_df = pd.DataFrame(info, columns=["gene_id", "transcript_id"])
+        tx_df["nb_exons"] = [nb_exons[x] for x in tx_df["transcript_id"]]
+        tx_max_exon = tx_df.groupby("gene_id", sort=False)["nb_exons"].idxmax()
 
-        for i in info:
-
-            gene_id, tx_id = i
-
-            if gene_id in gene_to_tx_max_exon:
-                if nb_exons[tx_id] > nb_exons[gene_to_tx_max_exon[gene_id]]:
-                    gene_to_tx_max_exon[gene_id] = tx_id
-            else:
-                gene_to_tx_max_exon[gene_id] = tx_id
-
-        tx_list_csv = ",".join(list(gene_to_tx_max_exon.values()))
+        tx_list_csv = ",".join(tx_df["transcript_id"][tx_max_exon])
 
         new_data = self._dll.select_by_key(self._data,
                                            native_str("transcript_id"),
@@ -2080,7 +2115,7 @@ class GTF(object):
                 try:
                     [float(x) for x in i]
                     if eval(parsed_exp_str):
-                        result += [pos]
+                        result.append(pos)
                 except:
                     msg = "Found non numeric values in: '%s'." % ",".join(i)
                     raise GTFtkError(msg)
@@ -2118,13 +2153,20 @@ class GTF(object):
 
         message("Calling nb_exons.", type="DEBUG")
 
-        nb_exons = OrderedDict()
-        nb_exons = defaultdict(lambda: 0, nb_exons)
+        nb_exons = defaultdict(lambda: 0)
 
-        tab = self.extract_data("transcript_id,feature")
-        for i in tab:
-            if i[1] == 'exon':
-                nb_exons[i[0]] += 1
+        tx_ids = self.select_by_key("feature",
+                                    "exon").extract_data("transcript_id",
+                                                         as_list=True)
+
+        if tx_ids:
+            # Keep transcripts in order of appearance
+            tx_uniq, tx_first, tx_count = np.unique(np.asarray(tx_ids),
+                                                    return_index=True,
+                                                    return_counts=True)
+            order = np.argsort(tx_first)
+            nb_exons.update(zip(tx_uniq[order].tolist(),
+                                tx_count[order].tolist()))
 
         return nb_exons
 
@@ -2153,23 +2195,21 @@ class GTF(object):
                  'strand',
                  'phase']
 
-        alist = list()
-
         ptr = self._dll.get_attribute_list(self._data)
 
-        for i in range(ptr.size):
-            alist += [ffi.string(ptr.data[i][0]).decode()]
+        to_str = ffi.string
+        data = ptr.data
 
         if as_dict:
-            d = dict()
-            for i in alist:
-                d[i] = 1
-            return d
+            return dict.fromkeys((to_str(data[i][0]).decode()
+                                  for i in range(ptr.size)), 1)
+
+        alist = [to_str(data[i][0]).decode() for i in range(ptr.size)]
+
+        if add_basic:
+            return basic + alist
         else:
-            if add_basic:
-                return basic + alist
-            else:
-                return alist
+            return alist
 
     def get_attr_value_list(self, key=None, count=False):
         """Get the list of possible values taken by an attributes from a GTF file..
@@ -2194,15 +2234,14 @@ class GTF(object):
         ptr = self._dll.get_attribute_values_list(self._data,
                                                   native_str(key))
 
-        alist = list()
-        for i in range(ptr.size):
-            if not count:
-                alist += [ffi.string(ptr.data[i][1]).decode()]
-            else:
-                alist += [[ffi.string(ptr.data[i][1]).decode(),
-                           ffi.string(ptr.data[i][0]).decode()]]
+        to_str = ffi.string
+        data = ptr.data
 
-        return alist
+        if not count:
+            return [to_str(data[i][1]).decode() for i in range(ptr.size)]
+
+        return [[to_str(data[i][1]).decode(),
+                 to_str(data[i][0]).decode()] for i in range(ptr.size)]
 
     def add_attr_from_file(self,
                            feat=None,
@@ -2248,33 +2287,34 @@ class GTF(object):
         tmp_file = make_tmp_file(prefix="gtftk_join_attr",
                                  suffix=".txt")
 
-        key_to_value = defaultdict(list)
-
         if os.stat(inputfile.name).st_size == 0:
             raise GTFtkError("File {f} is empty.".format(f=inputfile.name))
 
-        for line_nb, line in enumerate(inputfile):
-
-            if line_nb == 0:
-                if has_header:
-                    continue
+        try:
+            join_df = pd.read_csv(inputfile,
+                                  sep="\t",
+                                  header=None,
+                                  skiprows=1 if has_header else 0,
+                                  usecols=[0, 1],
+                                  dtype=str,
+                                  na_filter=False,
+                                  quoting=csv.QUOTE_NONE,
+                                  engine="c")
+        except pd.errors.EmptyDataError:
+            raise GTFtkError("File is empty.")
+        except (pd.errors.ParserError, ValueError):
+            raise GTFtkError("Does the file to join contains 2 fields ?")
 
-            line = chomp(line)
-            fields = line.split("\t")
+        if len(join_df) == 0:
+            raise GTFtkError("File is empty.")
 
-            try:
-                key_to_value[fields[0]] += [fields[1]]
-            except:
-                raise GTFtkError("Does the file to join contains 2 fields ?")
+        key_to_value = join_df.groupby(0, sort=False)[1].agg("|".join)
 
-        message("Found " + str(line_nb) + " lines.")
+        message("Found " + str(len(join_df)) + " lines.")
         message("Found " + str(len(key_to_value)) + " different entries.")
 
-        if line_nb == 0:
-            raise GTFtkError("File is empty.")
-
-        for k, _ in list(key_to_value.items()):
-            tmp_file.write(k + "\t" + "|".join(key_to_value[k]) + "\n")
+        tmp_file.write("".join(k + "\t" + v + "\n"
+                               for k, v in key_to_value.items()))
 
         tmp_file.close()
 
@@ -2323,31 +2363,43 @@ class GTF(object):
         if isinstance(inputfile, io.IOBase):
             inputfile = inputfile.name
 
-        id_to_val = defaultdict(lambda: defaultdict(list))
-
-        for line_nb, line in enumerate(open(inputfile, "r")):
-
-            line = chomp(line)
+        try:
+            mat_df = pd.read_csv(inputfile,
+                                 sep="\t",
+                                 header=None,
+                                 dtype=str,
+                                 na_filter=False,
+                                 quoting=csv.QUOTE_NONE,
+                                 engine="c")
+        except pd.errors.EmptyDataError:
+            raise GTFtkError("File {f} is empty.".format(f=inputfile))
+        except pd.errors.ParserError:
+            raise GTFtkError(
+                "The number of columns differ from the header")
 
-            if line_nb == 0:
-                tokens = line.split("\t")
+        if mat_df.shape[1] < 2:
+            raise GTFtkError(
+                "Found less than 2 columns. Is the file tabulated ?")
 
-                if len(tokens) < 2:
-                    raise GTFtkError(
-                        "Found less than 2 columns. Is the file tabulated ?")
-                key_names = tokens[1:]
-            else:
-                token = line.split("\t")
+        key_names = list(mat_df.iloc[0, 1:])
+        mat_df = mat_df.iloc[1:]
 
-                if len(token) < 2:
-                    raise GTFtkError(
-                        "Unable to split the line. Is the file tabulated ?")
-                if len(token[1:]) != len(key_names):
-                    raise GTFtkError(
-                        "The number of columns differ from the header")
+        # All value columns are merged per identifier in a single
+        # groupby pass (identifiers kept in order of appearance).
+        # Columns sharing the same name are merged into the same key.
+        id_to_val = dict()
 
-                for i in range(len(key_names)):
-                    id_to_val[key_names[i]][token[0]] += [token[i + 1]]
+        if len(set(key_names)) == len(key_names):
+            merged = mat_df.groupby(0, sort=False).agg("|".join)
+            for i in range(len(key_names)):
+                id_to_val[key_names[i]] = merged.iloc[:, i]
+        else:
+            ids = mat_df[0].to_numpy()
+            values = mat_df.iloc[:, 1:].to_numpy()
+            for name in set(key_names):
+                cols = [i for i, x in enumerate(key_names) if x == name]
+                id_to_val[name] = pd.Series(values[:, cols].ravel()).groupby(
+                    np.repeat(ids, len(cols)), sort=False).agg("|".join)
 
         for i in range(len(key_names)):
             message("Adding key " + key_names[i], type="DEBUG")
@@ -2355,9 +2407,10 @@ class GTF(object):
                                                                  '',
                                                                  key_names[i]),
                                      suffix=".txt")
-            for k, v in list(id_to_val[key_names[i]].items()):
-                tmp_file.write(k + "\t" + "|".join(v) + "\n")
-
+            id_to_val[key_names[i]].to_csv(tmp_file,
+                                           sep="\t",
+                                           header=False,
+                                           quoting=csv.QUOTE_NONE)
             tmp_file.close()
 
             if i == 0:
@@ -2427,8 +2480,8 @@ class GTF(object):
 
         tmp_file = make_tmp_file("add_attr", ".txt")
 
-        for i, j in zip(key_value, new_key_value):
-            tmp_file.write("\t".join([str(i), str(j)]) + "\n")
+        tmp_file.write("".join(str(i) + "\t" + str(j) + "\n"
+                               for i, j in zip(key_value, new_key_value)))
         tmp_file.close()
 
         new_data = self._dll.add_attributes(self._data,
@@ -2472,10 +2525,15 @@ class GTF(object):
 
         tmp_file = make_tmp_file("add_attr_from_dict", ".txt")
 
-        for i, j in list(a_dict.items()):
-            if isinstance(j, list):
-                j = ",".join([str(x) for x in j])
-            tmp_file.write("\t".join([str(i), str(j)]) + "\n")
+        if any(isinstance(j, list) for j in a_dict.values()):
+            tmp_file.write("".join(str(i) + "\t" +
+                                   (",".join(map(str, j)) if isinstance(j, list) else str(j)) +
+                                   "\n"
+                                   for i, j in a_dict.items()))
+        else:
+            # Scalar values only (the most common case).
+            tmp_file.write("".join([str(i) + "\t" + str(j) + "\n"
+                                    for i, j in a_dict.items()]))
         tmp_file.close()
 
         new_data = self._dll.add_attributes(self._data,
@@ -2613,17 +2671,19 @@ class GTF(object):
         if feat_id is None:
             feat_id = ft_type + "_id"
 
-        feat_size_dict = dict()
-
         new_data = self.select_by_key("feature", ft_type, 0)
 
-        for i in new_data:
-            feat_size_dict[i.get_attr_value(feat_id)[0]] = i.end - i.start
+        tab = new_data.extract_data([feat_id, "start", "end"],
+                                    as_list_of_list=True)
 
-        # Free the pointer
-        # self._dll.free(new_data._data)
+        if not tab:
+            return dict()
 
-        return feat_size_dict
+        feat_ids, starts, ends = zip(*tab)
+
+        sizes = np.array(ends, dtype=np.int64) - np.array(starts, dtype=np.int64)
+
+        return dict(zip(feat_ids, sizes.tolist()))
 
     def write(self, output, add_chr=0, gc_off=False):
         """write the gtf to a file.
@@ -2853,29 +2913,34 @@ class GTF(object):
 
         tx_bed = make_tmp_file("to_bed", ".bed")
 
+        sep_join = sep.join
+
+        # The trailing part of the name is the same for all lines.
+        name_tail = "" if not more_name else sep + sep_join(more_name)
+
         if not add_feature_type:
             key_csv = "seqid,start,end,score,strand," + ",".join(name)
-            for i in self.extract_data(key_csv, zero_based=True, nr=False):
-                line = [i[0],
-                        i[1],
-                        i[2],
-                        sep.join(i[5:] + more_name),
-                        i[3],
-                        i[4]]
-                tx_bed.write("\t".join(line) + "\n")
+
+            if len(name) == 1:
+                bed_lines = [i[0] + "\t" + i[1] + "\t" + i[2] + "\t" +
+                             i[5] + name_tail + "\t" +
+                             i[3] + "\t" + i[4] + "\n"
+                             for i in self.extract_data_iter_list(key_csv, zero_based=True)]
+            else:
+                bed_lines = [i[0] + "\t" + i[1] + "\t" + i[2] + "\t" +
+                             sep_join(i[5:]) + name_tail + "\t" +
+                             i[3] + "\t" + i[4] + "\n"
+                             for i in self.extract_data_iter_list(key_csv, zero_based=True)]
 
         else:
 
             key_csv = "seqid,start,end,score,strand,feature," + ",".join(name)
-            for i in self.extract_data(key_csv, zero_based=True, nr=False):
-                line = [i[0],
-                        i[1],
-                        i[2],
-                        sep.join(i[6:] + more_name + [i[5]]),
-                        i[3],
-                        i[4]]
-                tx_bed.write("\t".join(line) + "\n")
+            bed_lines = [i[0] + "\t" + i[1] + "\t" + i[2] + "\t" +
+                         sep_join(i[6:]) + name_tail + sep + i[5] + "\t" +
+                         i[3] + "\t" + i[4] + "\n"
+                         for i in self.extract_data_iter_list(key_csv, zero_based=True)]
 
+        tx_bed.write("".join(bed_lines))
         tx_bed.close()
 
         return BedTool(tx_bed.name)
@@ -2933,44 +2998,67 @@ class GTF(object):
 
         message("Calling 'get_5p_end'.", type="DEBUG")
 
-        tx_bed = make_tmp_file("TSS", ".bed")
-
-        for i in self.select_by_key("feature", feat_type):
-            name_list = i.get_attr_value(attr_name=name,
-                                         upon_none='set_na')
+        key_name = name + ['more_name'] + ['feature_name']
 
-            name_out = []
+        # All the required columns are retrieved in a single call to the
+        # library. Basic attributes are renamed as expected by extract_data.
+        key_csv = ",".join(["seqid", "start", "end", "score", "strand"] +
+                           [_FEATURE_KEY_ALIASES.get(x, x) for x in name])
 
-            value_name = name_list + more_name + feature_name
-            key_name = name + ['more_name'] + ['feature_name']
+        name_tail = more_name + feature_name
 
-            if explicit:
-                for k, v in zip(key_name, value_name):
-                    name_out += [str(k) + "=" + str(v)]
-            else:
-                name_out = [str(x) for x in value_name]
+        # The parts of the name that do not depend on the feature are
+        # computed once.
+        if explicit:
+            key_prefix = [str(k) + "=" for k in key_name]
+            tail_out = [k + str(v) for k, v in zip(key_prefix[len(name):],
+                                                   name_tail)]
+        else:
+            key_prefix = [""] * len(name)
+            tail_out = [str(x) for x in name_tail]
+
+        def _iter_5p_end():
+            for i in self.select_by_key("feature",
+                                        feat_type).extract_data_iter_list(key_csv):
+                if i[4] == '+':
+                    pos = int(i[1])
+                elif i[4] == '-':
+                    pos = int(i[2])
+                else:
+                    raise GTFtkError("Can not retrieve 5'end from an "
+                                     "unstranded features.")
 
-            name_out = [str(x) for x in name_out]
+                # Undefined values are reported as '.' (see
+                # Feature.get_attr_value()).
+                name_out = [k + (x if x != '?' else '.')
+                            for k, x in zip(key_prefix, i[5:])]
 
-            name_out = sep.join(name_out)
+                yield i, pos, sep.join(name_out + tail_out)
 
-            i.write_bed_5p_end(name=name_out,
-                               outputfile=tx_bed)
-        tx_bed.close()
+        if as_dict:
 
-        bed_obj = BedTool(tx_bed.name)
+            # The 5' end positions are computed directly from the
+            # features. No intermediate BED file is needed.
+            if one_based:
+                shift = 0
+            else:
+                shift = 1
 
-        if as_dict:
+            return {name_out: pos - shift for _, pos, name_out in _iter_5p_end()}
 
-            dict_obj = dict()
+        if pygtftk.utils.ADD_CHR == 1:
+            chr_prefix = "chr"
+        else:
+            chr_prefix = ""
 
-            for i in bed_obj:
-                if one_based:
-                    dict_obj[i.name] = i.start + 1
-                else:
-                    dict_obj[i.name] = i.start
+        tx_bed = make_tmp_file("TSS", ".bed")
+        tx_bed.write("".join([chr_prefix + i[0] + "\t" + str(pos - 1) + "\t" +
+                              str(pos) + "\t" + name_out + "\t" + i[3] +
+                              "\t" + i[4] + "\n"
+                              for i, pos, name_out in _iter_5p_end()]))
+        tx_bed.close()
 
-            return dict_obj
+        bed_obj = BedTool(tx_bed.name)
 
         return bed_obj
 
@@ -3068,42 +3156,58 @@ class GTF(object):
         if feature_name is None:
             feature_name = []
 
-        if isinstance(name, tuple):
-            name = list(name)
-
-        tx_bed = make_tmp_file("TTS", ".bed")
-
-        for i in self.select_by_key("feature", feat_type):
-            name_list = i.get_attr_value(attr_name=name,
-                                         upon_none='set_na')
-            name_out = []
+        key_name = name + more_name + feature_name
+        name_tail = more_name + feature_name
 
-            value_name = name_list + more_name + feature_name
-            key_name = name + more_name + feature_name
+        # All the required columns are retrieved in a single call to the
+        # library. Basic attributes are renamed as expected by extract_data.
+        key_csv = ",".join(["seqid", "start", "end", "score", "strand"] +
+                           [_FEATURE_KEY_ALIASES.get(x, x) for x in name])
 
-            if explicit:
-                for k, v in zip(key_name, value_name):
-                    name_out += [str(k) + "=" + str(v)]
-            else:
-                name_out = [str(x) for x in value_name]
+        # The parts of the name that do not depend on the feature are
+        # computed once.
+        if explicit:
+            key_prefix = [str(k) + "=" for k in key_name]
+            tail_out = [k + str(v) for k, v in zip(key_prefix[len(name):],
+                                                   name_tail)]
+        else:
+            key_prefix = [""] * len(name)
+            tail_out = [str(x) for x in name_tail]
+
+        def _iter_3p_end():
+            for i in self.select_by_key("feature",
+                                        feat_type).extract_data_iter_list(key_csv):
+                if i[4] == '+':
+                    pos = int(i[2])
+                elif i[4] == '-':
+                    pos = int(i[1])
+                else:
+                    raise GTFtkError("Can not retrieve 3'end from an "
+                                     "unstranded features.")
 
-            name_out = sep.join(name_out)
-            i.write_bed_3p_end(name=name_out,
-                               outputfile=tx_bed)
-        tx_bed.close()
+                # Undefined values are reported as '.' (see
+                # Feature.get_attr_value()).
+                name_out = [k + (x if x != '?' else '.')
+                            for k, x in zip(key_prefix, i[5:])]
 
-        bed_obj = BedTool(tx_bed.name)
+                yield i, pos, sep.join(name_out + tail_out)
 
         if as_dict:
+            return {name_out: pos - 1 for _, pos, name_out in _iter_3p_end()}
 
-            dict_obj = dict()
-
-            for i in bed_obj:
-                dict_obj[i.name] = i.start
+        if pygtftk.utils.ADD_CHR == 1:
+            chr_prefix = "chr"
+        else:
+            chr_prefix = ""
 
-            return dict_obj
+        tx_bed = make_tmp_file("TTS", ".bed")
+        tx_bed.write("".join([chr_prefix + i[0] + "\t" + str(pos - 1) + "\t" +
+                              str(pos) + "\t" + name_out + "\t" + i[3] +
+                              "\t" + i[4] + "\n"
+                              for i, pos, name_out in _iter_3p_end()]))
+        tx_bed.close()
 
-        return bed_obj
+        return BedTool(tx_bed.name)
 
     def get_tts(self,
                 name=("transcript_id"),
@@ -3194,34 +3298,54 @@ class GTF(object):
             return my_dict
         else:
 
-            strand = self.get_gn_strand()
-            tss = self.get_tss(as_dict=True)
+            if self._gn_strand is None:
+                self._gn_strand = self.get_gn_strand()
 
-            for gn_id in my_dict:
-                tx_tss = []
-                tx_list = my_dict[gn_id]
-                for tx_id in tx_list:
-                    tx_tss += [int(tss[tx_id])]
-                if strand[gn_id] != "-":
-                    my_dict[gn_id] = [x for y, x in sorted(zip(tx_tss, tx_list))]
-                else:
-                    my_dict[gn_id] = [x for y, x in sorted(zip(tx_tss, tx_list), reverse=True)]
+            if self._tx_tss is None:
+                self._tx_tss = self.get_tss(as_dict=True)
+
+            strand = self._gn_strand
+            tss = self._tx_tss
+
+            gn_list = list(my_dict)
+
+            if not gn_list:
+                return my_dict_of_dict if as_dict_of_dict else my_dict
+
+            # Transcripts of all genes are sorted at once by gene, TSS
+            # and transcript_id.
+            nb_tx = np.array([len(my_dict[x]) for x in gn_list])
+            tx_arr = np.array([y for x in gn_list for y in my_dict[x]])
+            tss_arr = np.array([int(tss[x]) for x in tx_arr], dtype=np.int64)
+            gn_idx = np.repeat(np.arange(len(gn_list)), nb_tx)
+            order = np.lexsort((tx_arr, tss_arr, gn_idx))
+
+            # Transcripts from minus-strand genes are ordered
+            # from highest to lowest TSS.
+            bounds = np.concatenate(([0], np.cumsum(nb_tx)))
+            order = np.concatenate([order[bounds[i]:bounds[i + 1]]
+                                    if strand[gn_list[i]] != "-" else
+                                    order[bounds[i]:bounds[i + 1]][::-1]
+                                    for i in range(len(gn_list))])
+            tx_sorted = tx_arr[order].tolist()
+
+            for i in range(len(gn_list)):
+                my_dict[gn_list[i]] = tx_sorted[bounds[i]:bounds[i + 1]]
 
             if as_dict_of_dict:
-                for gn_id in my_dict:
-                    tx_id_prev = None
-                    for pos, tx_id in enumerate(my_dict[gn_id]):
-                        if pos == 0:
-                            tss_num = 1
-                        else:
-                            if strand[gn_id] == "-":
-                                if tss[tx_id_prev] > tss[tx_id]:
-                                    tss_num += 1
-                            else:
-                                if tss[tx_id_prev] < tss[tx_id]:
-                                    tss_num += 1
-                        my_dict_of_dict[gn_id][tx_id] = tss_num
-                        tx_id_prev = tx_id
+                # The TSS number is incremented each time the TSS changes
+                # and restarts at 1 for each gene.
+                tss_sorted = tss_arr[order]
+                new_gene = np.zeros(len(order), dtype=bool)
+                new_gene[bounds[:-1]] = True
+                changed = new_gene.copy()
+                changed[1:] |= tss_sorted[1:] != tss_sorted[:-1]
+                nb_changes = np.cumsum(changed)
+                tss_num = (nb_changes - np.repeat(nb_changes[bounds[:-1]], nb_tx) + 1).tolist()
+
+                for i in range(len(gn_list)):
+                    my_dict_of_dict[gn_list[i]] = dict(zip(tx_sorted[bounds[i]:bounds[i + 1]],
+                                                           tss_num[bounds[i]:bounds[i + 1]]))
 
                 return my_dict_of_dict
             else:
@@ -3273,12 +3397,23 @@ class GTF(object):
                                                                                 2, 3,
                                                                                 4, 5])
 
-        if chr_list is None:
-            chrom_file_bed = chrom_info_to_bed_file(chrom_file)
-        else:
-            chrom_file_bed = chrom_info_to_bed_file(chrom_file,
-                                                    chr_list=chr_list)
-        chrom_file_bo = BedTool(chrom_file_bed.name)
+        # The BED version of a chromInfo file is reused across calls
+        # as long as the file is unchanged.
+        cache_key = (os.path.abspath(chrom_file.name),
+                     os.path.getmtime(chrom_file.name),
+                     None if chr_list is None else tuple(chr_list))
+
+        chrom_file_bed = _CHROM_BED_CACHE.get(cache_key)
+
+        if chrom_file_bed is None or not os.path.exists(chrom_file_bed):
+            if chr_list is None:
+                chrom_file_bed = chrom_info_to_bed_file(chrom_file).name
+            else:
+                chrom_file_bed = chrom_info_to_bed_file(chrom_file,
+                                                        chr_list=chr_list).name
+            _CHROM_BED_CACHE[cache_key] = chrom_file_bed
+
+        chrom_file_bo = BedTool(chrom_file_bed)
         chrom_file_bo = chrom_file_bo.subtract(tx_bo).sort()
 
         # for tracability
@@ -3286,10 +3421,30 @@ class GTF(object):
         chrom_file_bo.saveas(region_bed.name)
 
         if feature_name is not None:
-            tmp_file = make_tmp_file("intergenic", ".bed6")
-            for i in chrom_file_bo:
-                out_list = i[:3] + [feature_name, ".", "."]
-                tmp_file.write("\t".join(out_list) + "\n")
+            tmp_file = make_tmp_file("intergenic", ".bed6", buffering=1 << 20)
+
+            try:
+                bed_df = pd.read_csv(region_bed.name,
+                                     sep="\t",
+                                     header=None,
+                                     usecols=[0, 1, 2],
+                                     dtype=str,
+                                     na_filter=False,
+                                     quoting=csv.QUOTE_NONE,
+                                     engine="c")
+            except pd.errors.EmptyDataError:
+                bed_df = None
+
+            if bed_df is not None:
+                bed_df[3] = feature_name
+                bed_df[4] = "."
+                bed_df[5] = "."
+                bed_df.to_csv(tmp_file,
+                              sep="\t",
+                              header=False,
+                              index=False,
+                              quoting=csv.QUOTE_NONE)
+
             tmp_file.close()
             chrom_file_bo = BedTool(tmp_file.name)
 
@@ -3349,71 +3504,91 @@ class GTF(object):
             introns_bo.saveas(introns_bed.name)
         else:
 
-            intron_bed = make_tmp_file("introns", ".bed")
-            exon_starts = defaultdict(list)
-            exon_ends = defaultdict(list)
-            tx_list = []
+            intron_bed = make_tmp_file("introns", ".bed", buffering=1 << 20)
+            tx_to_idx = dict()
             chr_list = []
             info_list = []
             strand_list = []
+            tx_idx = []
+            exon_starts = []
+            exon_ends = []
 
-            ids = "feature,seqid,start,end,transcript_id,strand,"
+            ids = "seqid,start,end,transcript_id,strand,"
             ids = ids + ",".join(name)
 
-            for i in self.extract_data(ids):
-                if i[0] == "exon":
-                    if i[4] not in exon_starts:
-                        tx_list += [i[4]]
-                        chr_list += [i[1]]
-                        strand_list += [i[5]]
-                        if feat_name:
-                            if feat_name_last:
-                                info_list += [sep.join(i[6:] + ["intron"])]
-                            else:
-                                info_list += [sep.join(["intron"] + i[6:])]
-                        else:
-                            info_list += [sep.join(i[6:])]
-                    exon_starts[i[4]] += [i[2]]
-                    exon_ends[i[4]] += [i[3]]
-
-            for tx_cur in exon_starts:
-                exon_starts[tx_cur] = sorted(
-                    [int(x) for x in exon_starts[tx_cur]])
-                exon_ends[tx_cur] = sorted([int(x) for x in exon_ends[tx_cur]])
-
-            for tx_cur, chr, info, strand in zip(tx_list, chr_list, info_list, strand_list):
-
-                nb_introns = len(exon_ends[tx_cur]) - 1
-
-                if strand == "+":
-                    n = 1
-                elif strand == "-":
-                    n = nb_introns
+            if feat_name:
+                if feat_name_last:
+                    def make_info(x):
+                        return sep.join(x + ["intron"])
                 else:
-                    continue
-
-                for i in range(0, nb_introns):
-
-                    if intron_nb_in_name:
-                        out_list = [chr,
-                                    str(exon_ends[tx_cur][i]),
-                                    str(exon_starts[tx_cur][i + 1] - 1),
-                                    sep.join([info] + [str(n)]),
-                                    ".",
-                                    strand]
-                    else:
-                        out_list = [chr,
-                                    str(exon_ends[tx_cur][i]),
-                                    str(exon_starts[tx_cur][i + 1] - 1),
-                                    info,
-                                    str(n),
-                                    strand]
-                    if strand == "+":
-                        n += 1
-                    elif strand == "-":
-                        n -= 1
-
-                    intron_bed.write("\t".join(out_list) + "\n")
+                    def make_info(x):
+                        return sep.join(["intron"] + x)
+            else:
+                make_info = sep.join
+
+            for i in self.select_by_key("feature",
+                                        "exon").extract_data_iter_list(ids):
+                idx = tx_to_idx.get(i[3])
+                if idx is None:
+                    idx = tx_to_idx[i[3]] = len(chr_list)
+                    chr_list.append(i[0])
+                    strand_list.append(i[4])
+                    info_list.append(make_info(i[5:]))
+                tx_idx.append(idx)
+                exon_starts.append(i[1])
+                exon_ends.append(i[2])
+
+            tx_idx = np.array(tx_idx, dtype=np.int64)
+            exon_starts = np.array(exon_starts, dtype=np.int64)
+            exon_ends = np.array(exon_ends, dtype=np.int64)
+
+            # Exon starts and ends are sorted (independently) within each
+            # transcript. Transcripts are kept in order of appearance.
+            exon_starts = exon_starts[np.lexsort((exon_starts, tx_idx))]
+            exon_ends = exon_ends[np.lexsort((exon_ends, tx_idx))]
+            tx_idx = np.sort(tx_idx, kind="stable")
+
+            # An intron lies between two consecutive exons of a transcript.
+            is_intron = tx_idx[1:] == tx_idx[:-1]
+            intron_tx = tx_idx[:-1][is_intron]
+            intron_starts = exon_ends[:-1][is_intron]
+            intron_ends = exon_starts[1:][is_intron] - 1
+
+            nb_exons = np.bincount(tx_idx, minlength=len(chr_list))
+            first_exon = np.cumsum(nb_exons) - nb_exons
+            intron_rank = np.flatnonzero(is_intron) - first_exon[intron_tx]
+            nb_introns = nb_exons[intron_tx] - 1
+
+            # Introns from unstranded transcripts are discarded.
+            strand_arr = np.array(strand_list, dtype=object)[intron_tx]
+            is_plus = strand_arr == "+"
+            is_stranded = is_plus | (strand_arr == "-")
+
+            intron_num = np.where(is_plus,
+                                  intron_rank + 1,
+                                  nb_introns - intron_rank)[is_stranded]
+            intron_tx = intron_tx[is_stranded]
+            intron_num = pd.Series(intron_num).astype(str)
+            info = pd.Series(np.array(info_list, dtype=object)[intron_tx])
+
+            if intron_nb_in_name:
+                name_col = info + sep + intron_num
+                score_col = "."
+            else:
+                name_col = info
+                score_col = intron_num
+
+            pd.DataFrame({0: np.array(chr_list, dtype=object)[intron_tx],
+                          1: intron_starts[is_stranded],
+                          2: intron_ends[is_stranded],
+                          3: name_col,
+                          4: score_col,
+                          5: strand_arr[is_stranded]}).to_csv(intron_bed,
+                                                              sep="\t",
+                                                              header=False,
+                                                              index=False,
+                                                              quoting=csv.QUOTE_NONE)
+            intron_bed.close()
 
             introns_bo = BedTool(intron_bed.name)
 
@@ -3443,35 +3618,51 @@ class GTF(object):
 
         message("Calling 'get_midpoints'.", type="DEBUG")
 
-        midpoints_bed = make_tmp_file("Midpoints", ".bed")
+        midpoints_bed = make_tmp_file("Midpoints", ".bed", buffering=1 << 20)
 
         # Select all lines and dump them into a bed file
         bed_obj = self.to_bed(name,
                               sep=sep).sort()
-        for line in bed_obj:
-
-            diff = line.end - line.start
-
-            if diff % 2 != 0:
-                # e.g 10-13 (zero based) -> 11-13 one based
-                # mipoint is 12 (one-based) -> 11-12 (zero based)
-                # e.g 949-1100 (zero based) -> 950-1100 one based
-                # mipoint is 1025 (one-based) -> 1024-1025 (zero based)
-                # floored division (python 2)...
-                line.end = line.start + int(diff / 2) + 1
-                line.start = line.end - 1
-            else:
-                # e.g 10-14 (zero based) -> 11-14 one based
-                # mipoint is 12-13 (one-based) -> 11-13 (zero based)
-                # e.g 9-5100 (zero based) -> 10-5100 one based
-                # mipoint is 2555-2555 (one-based) -> 2554-2555 (zero based)
-                # floored division (python 2)...
-                # No real center. Take both
-
-                line.start = line.start + int(diff / 2) - 1
-                line.end = line.start + 2
 
-            midpoints_bed.write(str(line))
+        try:
+            bed_df = pd.read_csv(bed_obj.fn,
+                                 sep="\t",
+                                 header=None,
+                                 dtype=str,
+                                 na_filter=False,
+                                 quoting=csv.QUOTE_NONE,
+                                 engine="c")
+        except pd.errors.EmptyDataError:
+            bed_df = None
+
+        if bed_df is not None:
+            start = bed_df[1].to_numpy(dtype=np.int64)
+            end = bed_df[2].to_numpy(dtype=np.int64)
+            diff = end - start
+            odd = diff & 1
+
+            # Odd length:
+            # e.g 10-13 (zero based) -> 11-13 one based
+            # mipoint is 12 (one-based) -> 11-12 (zero based)
+            # e.g 949-1100 (zero based) -> 950-1100 one based
+            # mipoint is 1025 (one-based) -> 1024-1025 (zero based)
+            # Even length:
+            # e.g 10-14 (zero based) -> 11-14 one based
+            # mipoint is 12-13 (one-based) -> 11-13 (zero based)
+            # e.g 9-5100 (zero based) -> 10-5100 one based
+            # mipoint is 2555-2555 (one-based) -> 2554-2555 (zero based)
+            # No real center. Take both
+            new_start = start + (diff >> 1) - 1 + odd
+            new_end = new_start + 2 - odd
+
+            bed_df[1] = new_start
+            bed_df[2] = new_end
+
+            bed_df.to_csv(midpoints_bed,
+                          sep="\t",
+                          header=False,
+                          index=False,
+                          quoting=csv.QUOTE_NONE)
 
         midpoints_bed.close()
 
@@ -3498,25 +3689,13 @@ class GTF(object):
 
         """
 
-        alist = list()
-
-        tab = self.extract_data(keys="transcript_id")
-
-        if nr:
-            d = dict()
-            adict = defaultdict(lambda: 0, d)
-
-            for i in tab:
-                if i[0] not in adict:
-                    if i[0] not in [".", "?"]:
-                        alist += [i[0]]
-                        adict[i[0]] = 1
-        else:
-            for i in tab:
-                if i[0] not in [".", "?"]:
-                    alist += [i[0]]
-
-        return alist
+        # Redundant values are discarded by the library (order of
+        # appearance is kept).
+        return self.extract_data(keys="transcript_id",
+                                 as_list=True,
+                                 nr=nr,
+                                 no_na=True,
+                                 hide_undef=True)
 
     def get_gn_ids(self, nr=False):
         """Returns all gene ids from the GTF file
@@ -3541,23 +3720,11 @@ class GTF(object):
 
         message("Calling 'get_gn_ids'.", type="DEBUG")
 
-        alist = list()
-
-        tab = self.extract_data(keys="gene_id", )
-
-        if nr:
-            d = dict()
-            adict = defaultdict(lambda: 0, d)
-
-            for i in tab:
-                if i[0] not in adict:
-                    alist += [i[0]]
-                    adict[i[0]] = 1
-        else:
-            for i in tab:
-                alist += [i[0]]
-
-        return alist
+        # Redundant values are discarded by the library (order of
+        # appearance is kept).
+        return self.extract_data(keys="gene_id",
+                                 as_list=True,
+                                 nr=nr)
 
     def get_feature_list(self, nr=False):
         """Returns the list of features.
@@ -3578,21 +3745,17 @@ class GTF(object):
 
         message("Calling 'get_feature_list'.", type="DEBUG")
 
-        alist = list()
+        if nr and self._feat_list_nr is not None:
+            return list(self._feat_list_nr)
 
-        tab = self.extract_data(keys="feature")
+        # Redundant values are discarded by the library (order of
+        # appearance is kept).
+        alist = self.extract_data(keys="feature",
+                                  as_list=True,
+                                  nr=nr)
 
         if nr:
-            d = dict()
-            adict = defaultdict(lambda: 0, d)
-
-            for i in tab:
-                if i[0] not in adict:
-                    alist += [i[0]]
-                    adict[i[0]] = 1
-        else:
-            for i in tab:
-                alist += [i[0]]
+            self._feat_list_nr = list(alist)
 
         return alist
 
@@ -3618,23 +3781,20 @@ class GTF(object):
         message("Calling 'get_chroms'.", type="DEBUG")
 
         if as_dict:
-            alist = OrderedDict()
             ptr = self._dll.get_seqid_list(self._data)
-            for i in range(ptr.size):
-                key = ffi.string(ptr.data[i][1].decode())
-                val = ffi.string(ptr.data[i][0].decode())
-                alist[key] = val
+            to_str = ffi.string
+            data = ptr.data
+            alist = OrderedDict((to_str(data[i][1]).decode(),
+                                 to_str(data[i][0]).decode())
+                                for i in range(ptr.size))
         else:
             if nr:
-                alist = list()
                 ptr = self._dll.get_seqid_list(self._data)
-                for i in range(ptr.size):
-                    alist += [ffi.string(ptr.data[i][1]).decode()]
+                to_str = ffi.string
+                data = ptr.data
+                alist = [to_str(data[i][1]).decode() for i in range(ptr.size)]
             else:
-                alist = list()
-                tab = self.extract_data(keys="seqid")
-                for i in tab:
-                    alist += [i[0]]
+                alist = self.extract_data(keys="seqid", as_list=True)
 
         return alist
 
@@ -3659,20 +3819,36 @@ class GTF(object):
 
         message("Calling 'get_transcript_size'.", type="DEBUG")
 
-        d = dict()
-        tx_size = defaultdict(lambda: 0, d)
-
-        tab = self.extract_data(keys="feature,transcript_id,start,end")
+        tx_size = defaultdict(lambda: 0)
 
         if not with_intron:
+            feat_type = "exon"
+        else:
+            feat_type = "transcript"
 
-            for i in tab:
-                if i[0] == "exon":
-                    tx_size[i[1]] += int(i[3]) - int(i[2]) + 1
+        tab = self.select_by_key("feature",
+                                 feat_type).extract_data("transcript_id,start,end",
+                                                         as_list_of_list=True)
+
+        if not tab:
+            return tx_size
+
+        tx_ids, starts, ends = zip(*tab)
+        sizes = np.asarray(ends, dtype=np.int64) - np.asarray(starts, dtype=np.int64) + 1
+
+        if not with_intron:
+            # Exon sizes are summed per transcript (transcripts kept in
+            # order of appearance).
+            tx_uniq, tx_first, tx_inv = np.unique(np.asarray(tx_ids),
+                                                  return_index=True,
+                                                  return_inverse=True)
+            tx_sum = np.zeros(len(tx_uniq), dtype=np.int64)
+            np.add.at(tx_sum, tx_inv, sizes)
+            order = np.argsort(tx_first)
+            tx_size.update(zip(tx_uniq[order].tolist(),
+                               tx_sum[order].tolist()))
         else:
-            for i in tab:
-                if i[0] == "transcript":
-                    tx_size[i[1]] = int(i[3]) - int(i[2]) + 1
+            tx_size.update(zip(tx_ids, sizes.tolist()))
 
         return tx_size
 
@@ -3700,15 +3876,21 @@ class GTF(object):
         if input_file.closed:
             input_file = open(input_file.name, "r")
 
-        tmp = input_file.readlines()
+        # The file is checked in a single pass without being loaded.
+        nb_lines = 0
+        has_tab = False
 
-        if len(tmp) != len(self):
+        for line in input_file:
+            nb_lines += 1
+            if not has_tab and "\t" in line:
+                has_tab = True
+
+        if nb_lines != len(self):
             raise GTFtkError(
                 "The number of lines to add should be the same as the number of lines in the GTF.")
 
-        for line in tmp:
-            if "\t" in line:
-                raise GTFtkError("input_file should contain only one column.")
+        if has_tab:
+            raise GTFtkError("input_file should contain only one column.")
 
         new_data = self._dll.add_attr_column(self._data,
                                              native_str(input_file.name),
@@ -4,11 +4,13 @@
 """
 
 import argparse
+import csv
 import os
 import sys
 from _collections import defaultdict
 
 import gc
+import pandas as pd
 
 from pygtftk import arg_formatter
 from pygtftk.cmd_object import CmdObject
@@ -124,7 +126,11 @@ def closest_genes(
 
     gtf = GTF(inputfile)
     gn_gtf = gtf.select_by_key("feature", "gene")
-    gn_ids = gn_gtf.get_gn_ids(nr=True)
+
+    if text_format:
+        # The whole GTF is only needed to add closest genes as attributes.
+        # Release it as soon as gene features have been selected.
+        del gtf
 
     if len(gn_gtf) == 0:
         message("No gene feature found. Please use convert_ensembl.",
@@ -133,7 +139,17 @@ def closest_genes(
         message("Two much neighbors",
                 type="ERROR")
 
-    all_ids = gn_gtf.extract_data(identifier, as_list=True, no_na=False)
+    # gene_id and identifier are extracted in a single pass.
+    # Redundant gene ids are discarded (order of appearance is kept).
+    if identifier == "gene_id":
+        all_ids = gn_gtf.extract_data(identifier, as_list=True, no_na=False)
+        gn_ids = list(dict.fromkeys(all_ids))
+    else:
+        id_list = gn_gtf.extract_data("gene_id," + identifier,
+                                      as_list_of_list=True,
+                                      no_na=False)
+        gn_ids = list(dict.fromkeys([x[0] for x in id_list]))
+        all_ids = [x[1] for x in id_list]
 
     if "." in all_ids:
         message("Some identifiers are undefined ('.').",
@@ -147,52 +163,36 @@ def closest_genes(
     # load GTF and requested regions (for source/'from' transcript)
     # ----------------------------------------------------------------------
 
-    if from_region_type == 'tss':
-        from_regions = gn_gtf.get_5p_end(feat_type="gene",
-                                         name=[identifier],
-                                         ).cut([0, 1, 2,
-                                                3, 4, 5]).sort()
-    elif from_region_type == 'tts':
-        from_regions = gn_gtf.get_3p_end(feat_type="gene",
-                                         name=[identifier],
-                                         ).cut([0, 1, 2,
-                                                3, 4, 5]).sort()
-    elif from_region_type == 'gene':
-        from_regions = gn_gtf.to_bed(name=[identifier],
-                                     ).cut([0, 1, 2,
-                                            3, 4, 5]).sort()
-    else:
-        message("Unknown type.", type="ERROR")
+    def get_regions(region_type):
+        if region_type == 'tss':
+            bed_obj = gn_gtf.get_5p_end(feat_type="gene",
+                                        name=[identifier])
+        elif region_type == 'tts':
+            bed_obj = gn_gtf.get_3p_end(feat_type="gene",
+                                        name=[identifier])
+        elif region_type == 'gene':
+            bed_obj = gn_gtf.to_bed(name=[identifier])
+        else:
+            message("Unknown type.", type="ERROR")
+
+        return bed_obj.cut([0, 1, 2, 3, 4, 5]).sort()
+
+    from_regions = get_regions(from_region_type)
 
     # ----------------------------------------------------------------------
     # load GTF and requested regions (for dest/'to' transcript)
+    # The same regions are reused if 'from' and 'to' types are identical.
     # ----------------------------------------------------------------------
 
-    if to_region_type == 'tss':
-        to_regions = gn_gtf.get_5p_end(feat_type="gene",
-                                       name=[identifier],
-                                       ).cut([0, 1, 2,
-                                              3, 4, 5]).sort()
-    elif to_region_type == 'tts':
-        to_regions = gn_gtf.get_3p_end(feat_type="gene",
-                                       name=[identifier],
-                                       ).cut([0, 1, 2,
-                                              3, 4, 5]).sort()
-
-    elif to_region_type == 'gene':
-        to_regions = gn_gtf.to_bed(name=[identifier],
-                                   ).cut([0, 1, 2,
-                                          3, 4, 5]).sort()
+    if to_region_type == from_region_type:
+        to_regions = from_regions
     else:
-        message("Unknown type.", type="ERROR")
+        to_regions = get_regions(to_region_type)
 
     # ----------------------------------------------------------------------
     # Search closest genes
     # ----------------------------------------------------------------------
 
-    gene_closest = defaultdict(list)
-    gene_closest_dist = defaultdict(list)
-
     closest_bo = from_regions.closest(b=to_regions,
                                       k=nb_neighbors,
                                       N=True,
@@ -200,9 +200,25 @@ def closest_genes(
                                       S=diff_strandedness,
                                       d=True)
 
-    for i in closest_bo:
-        gene_closest[i[3]] += [i[9]]
-        gene_closest_dist[i[3]] += [i[12]]
+    # Only the source name (4th), closest name (10th) and distance (last)
+    # columns are needed. They are grouped by source name (order of
+    # appearance is kept).
+    try:
+        closest_df = pd.read_csv(closest_bo.fn,
+                                 sep="\t",
+                                 header=None,
+                                 usecols=[3, 9, 12],
+                                 dtype=str,
+                                 na_filter=False,
+                                 quoting=csv.QUOTE_NONE,
+                                 engine="c")
+        closest_grp = closest_df.groupby(3, sort=False)
+        gene_closest = defaultdict(list, closest_grp[9].agg(list).to_dict())
+        gene_closest_dist = defaultdict(list,
+                                        closest_grp[12].agg(list).to_dict())
+    except pd.errors.EmptyDataError:
+        gene_closest = defaultdict(list)
+        gene_closest_dist = defaultdict(list)
 
     if not text_format:
 
@@ -223,21 +239,17 @@ def closest_genes(
         if not no_header:
             outputfile.write("genes\tclosest_genes\tdistances\n")
 
-        for gene in gn_ids:
-
-            if not collapse:
-
-                outputfile.write("\t".join([gene,
-                                            ",".join(gene_closest[gene]),
-                                            ",".join(gene_closest_dist[gene])]) + "\n")
-
-            else:
-
-                for closest, dist in zip(gene_closest[gene],
-                                         gene_closest_dist[gene]):
-                    outputfile.write("\t".join([gene,
-                                                closest,
-                                                dist]) + "\n")
+        if not collapse:
+            outputfile.write("".join(["\t".join([gene,
+                                                 ",".join(gene_closest[gene]),
+                                                 ",".join(gene_closest_dist[gene])]) + "\n"
+                                      for gene in gn_ids]))
+        else:
+            # k lines per gene: stream them rather than building one string.
+            outputfile.writelines(gene + "\t" + closest + "\t" + dist + "\n"
+                                  for gene in gn_ids
+                                  for closest, dist in zip(gene_closest[gene],
+                                                           gene_closest_dist[gene]))
 
         gc.disable()
 
@@ -87,31 +87,15 @@ def del_attr(
 
     if reg_exp:
 
-        key_list = []
-
         try:
             rgxp = re.compile(key)
         except:
             message("Check the regular expression please.", type="ERROR")
 
-        for attr in attr_list:
-            if rgxp.search(attr):
-                key_list += [attr]
+        key_list = [attr for attr in attr_list if rgxp.search(attr)]
     else:
         key_list = key.split(",")
 
-    # ----------------------------------------------------------------------
-    # If invert-match select all but the selected
-    # ----------------------------------------------------------------------
-
-    key_to_del = []
-    if invert_match:
-        for attr in attr_list:
-            if attr not in key_list:
-                key_to_del += [attr]
-    else:
-        key_to_del = key_list
-
     # ----------------------------------------------------------------------
     # Delete the keys
     # ----------------------------------------------------------------------
@@ -137,44 +137,36 @@ def discretize_key(inputfile=None,
     # -------------------------------------------------------------------------
 
     gtf = GTF(inputfile, check_ensembl_format=False)
-    src_values = gtf.extract_data(src_key, as_list=True)
+    # A single object Series feeds both the checks and the numeric parsing.
+    src_values = pandas.Series(gtf.extract_data(src_key, as_list=True),
+                               dtype=object)
 
-    if len([x for x in src_values if x not in ['.', '?']]) == 0:
+    if src_values.isin(['.', '?']).all():
         message('The key was not found in this GTF.',
                 type="ERROR")
 
-    min_val = None
-    max_val = None
-
-    dest_values = []
-    dest_pos = []
-
-    for p, v in enumerate(src_values):
-        try:
-            a = float(v)
-            if min_val is not None:
-                if a > max_val:
-                    max_val = a
-                if a < min_val:
-                    min_val = a
-            else:
-                min_val = a
-                max_val = a
-
-            dest_values += [a]
-            dest_pos += [p]
-        except ValueError:
-            pass
-
-    if min_val is None:
+    # Non-numeric values are coerced to NaN and discarded.
+    src_numeric = pandas.to_numeric(src_values,
+                                    errors="coerce").to_numpy(dtype=np.float64)
+    is_numeric = ~np.isnan(src_numeric)
+
+    if not is_numeric.any():
         message("Did not find numeric values in the source key.",
                 type="ERROR")
+
+    dest_pos = np.flatnonzero(is_numeric)
+    dest_arr = src_numeric[is_numeric]
+    dest_values = dest_arr.tolist()
+
+    min_val = float(dest_arr.min())
+    max_val = float(dest_arr.max())
+
     if min_val == max_val:
         message("The minimum and maximum values found in the source key are the same.",
                 type="ERROR")
 
     if log:
-        if 0 in dest_values:
+        if (dest_arr == 0).any():
             message("Encountered zero values before log transformation.",
                     type="WARNING",
                     force=True)
@@ -183,11 +175,12 @@ def discretize_key(inputfile=None,
                     force=True)
 
             pseudo_count = 1
-            dest_values = list(np.log2([x + pseudo_count for x in dest_values]))
+            dest_arr = np.log2(dest_arr + pseudo_count)
+            dest_values = dest_arr.tolist()
 
         # update max/min values
-        max_val = max(dest_values)
-        min_val = min(dest_values)
+        max_val = float(dest_arr.max())
+        min_val = float(dest_arr.min())
 
     # Apply the same rule as pandas.cut when bins is an int.
     min_val = min_val - max_val / 1000
@@ -200,22 +193,16 @@ def discretize_key(inputfile=None,
 
     if percentiles:
         if percentiles_of_uniq:
-            dest_values_tmp = [min_val] + list(set(dest_values))
+            dest_values_tmp = np.concatenate(([min_val], np.unique(dest_values)))
         else:
-            dest_values_tmp = [min_val] + dest_values
+            dest_values_tmp = np.concatenate(([min_val], dest_values))
         n = nb_levels
 
-        q = [
-            np.percentile(
-                dest_values_tmp,
-                100 /
-                n *
-                i) for i in range(
-                0,
-                n)]
-        q = q + [np.percentile(dest_values_tmp, 100)]
-
-        if len(q) != len(set(q)):
+        # All percentiles are computed in a single call (one sort).
+        q = np.percentile(dest_values_tmp,
+                          [100 / n * i for i in range(0, n)] + [100]).tolist()
+
+        if np.unique(q).size != len(q):
             message("No ties are accepted in  percentiles.",
                     type="WARNING",
                     force=True)
@@ -229,20 +216,30 @@ def discretize_key(inputfile=None,
     # -------------------------------------------------------------------------
 
     if percentiles:
-
-        (breaks, cat_label) = pandas.cut(dest_values,
-                                         bins=q,
-                                         labels=labels,
-                                         retbins=True)
+        bins = np.asarray(q, dtype=np.float64)
     else:
-        (breaks, cat_label) = pandas.cut(dest_values,
-                                         bins=nb_levels,
-                                         labels=labels,
-                                         retbins=True)
+        # Apply the same rule as pandas.cut when bins is an int.
+        bin_min = min(dest_values)
+        bin_max = max(dest_values)
+        bins = np.linspace(bin_min, bin_max, nb_levels + 1)
+        bins[0] -= (bin_max - bin_min) * 0.001
+
+    # Intervals are closed on the right: (bins[i], bins[i + 1]].
+    # bins are strictly increasing (see ties check), so a binary search
+    # is enough.
+    bin_idx = np.searchsorted(bins, dest_values, side="left") - 1
+
+    # As with pandas.cut, values on/below the lower bound of the first
+    # interval (e.g. with percentiles when all values are negative) are
+    # left out of all intervals.
+    in_bins = bin_idx >= 0
+    bin_idx = bin_idx[in_bins]
+    dest_pos = dest_pos[in_bins]
 
     if labels is None:
         # The include_lowest argument of pandas is not working.
         # Using this workaround to avoid minimum value outside of data range.
+        cat_label = bins.tolist()
         cat_label[0] = min(dest_values)
         cat_label = [round(x, precision) for x in cat_label]
         if precision == 0:
@@ -251,11 +248,12 @@ def discretize_key(inputfile=None,
         cat_label[0] = cat_label[0].replace("(", "[")
         cat_label = [x.replace(")", "]") for x in cat_label]
         cat_label = [str(x).replace(", ", "_") for x in cat_label]
+    else:
+        cat_label = labels
 
-        # The string can be very problematic later...
-        breaks.categories = cat_label
+    breaks = np.asarray(cat_label, dtype=object)[bin_idx]
 
-    message("Categories: " + str(list(breaks.categories)),
+    message("Categories: " + str(cat_label),
             type="INFO",
             force=True)
 
@@ -267,9 +265,11 @@ def discretize_key(inputfile=None,
 
     tmp_file = make_tmp_file(prefix="discretized_keys", suffix=".txt")
 
+    # dest_pos holds the line number of each numeric value (non-numeric
+    # lines are simply absent), so no per-line counter is needed.
     with tmp_file as tp_file:
-        for p, v in zip(dest_pos, breaks):
-            tp_file.write(str(p) + "\t" + str(v) + '\n')
+        tp_file.write("".join([str(p) + "\t" + v + '\n'
+                               for p, v in zip(dest_pos.tolist(), breaks)]))
 
     gtf.add_attr_to_pos(tmp_file,
                         new_key=dest_key).write(outputfile,
@@ -318,6 +318,24 @@ else:
       [ "$result" = "[0.23_0.62],(0.62_1.0]," ]
     }
 
+    # discretize_key: percentiles
+    @test "discretize_key_4" {
+     result=`gtftk join_attr -i simple.gtf  -j simple.join_mat -k gene_id -m | gtftk discretize_key -k S1 -d S1_d -n 2 -p  | gtftk tabulate  -k S1_d -Hun| perl -npe 's/\\n/,/'`
+      [ "$result" = "[0.23_0.78],(0.78_1.0]," ]
+    }
+
+    # discretize_key: percentiles and labels
+    @test "discretize_key_5" {
+     result=`gtftk join_attr -i simple.gtf  -j simple.join_mat -k gene_id -m | gtftk discretize_key -k S2 -d S2_d -n 3 -p -u -l low,mid,high | gtftk tabulate  -k S2_d -Hun| perl -npe 's/\\n/,/'`
+      [ "$result" = "low,mid,high," ]
+    }
+
+    # discretize_key: percentiles of negative values (the lowest one is outside the first class)
+    @test "discretize_key_6" {
+     result=`printf 'G0001\\t-3\\nG0002\\t-2\\nG0003\\t-1\\n' > simple_neg.join; gtftk join_attr -i simple.gtf  -j simple_neg.join -k gene_id -n neg -t gene | gtftk discretize_key -k neg -d neg_d -n 2 -p | gtftk tabulate  -k neg_d -Hun| perl -npe 's/\\n/,/'`
+      [ "$result" = "(-2.5_-1.0]," ]
+    }
+
    """
 
     CmdObject(name="discretize_key",
@@ -4,18 +4,19 @@
 """
 
 import argparse
+import csv
 import gc
 import sys
 
+import numpy as np
 import os
+import pandas as pd
 
 from pygtftk import arg_formatter
 from pygtftk.cmd_object import CmdObject
 from pygtftk.gtf_interface import GTF
-from pygtftk.utils import chomp
 from pygtftk.utils import close_properly
 from pygtftk.utils import message
-from pygtftk.utils import write_properly
 
 __updated__ = "2018-01-20"
 
@@ -132,27 +133,30 @@ def get_5p_3p_coords(inputfile=None,
         message("Requested feature could not be found. Use convert_ensembl maybe.",
                 type="ERROR")
 
-    if transpose == 0:
-        for i in bed_obj:
-            write_properly(chomp(str(i)), outputfile)
-    else:
-        for i in bed_obj:
-            out_list = list()
-            if i.strand == "+":
-                out_list = [i.chrom,
-                            str(i.start + transpose),
-                            str(i.end + transpose),
-                            i.name,
-                            i.score,
-                            i.strand]
-            elif i.strand == "-":
-                out_list = [i.chrom,
-                            str(i.start - transpose),
-                            str(i.end - transpose),
-                            i.name,
-                            i.score,
-                            i.strand]
-            outputfile.write("\t".join(out_list) + "\n")
+    bed_df = pd.read_csv(bed_obj.fn,
+                         sep="\t",
+                         header=None,
+                         dtype=str,
+                         na_filter=False,
+                         quoting=csv.QUOTE_NONE,
+                         engine="c")
+
+    if transpose != 0:
+        # Coordinates are moved downstream on '+' and upstream on '-'.
+        # Features with undefined strand are left unchanged.
+        strand = bed_df[5].to_numpy()
+        shift = np.select([strand == "+", strand == "-"],
+                          [transpose, -transpose],
+                          default=0)
+        bed_df[1] = (bed_df[1].to_numpy(dtype=np.int64) + shift).astype(str)
+        bed_df[2] = (bed_df[2].to_numpy(dtype=np.int64) + shift).astype(str)
+
+    bed_df.to_csv(outputfile,
+                  sep="\t",
+                  header=False,
+                  index=False,
+                  quoting=csv.QUOTE_NONE)
+
     gc.disable()
     close_properly(outputfile, inputfile)
 
@@ -243,6 +247,12 @@ else:
      result=`gtftk  get_5p_3p_coords -p 10 -e -m bla -i simple.gtf -n transcript_id,gene_id,gene_name| head -1 | cut -f4`
       [ "$result" = "transcript_id=G0001T002|gene_id=G0001|gene_name=.|more_name=bla" ]
     }
+
+    #get_5p_3p_coord: test transpose with an unstranded feature
+    @test "get_5p_3p_coords_12" {
+     result=`awk 'BEGIN{FS=OFS="\\t"}/G0002/{$7="."}{print}' simple.gtf | gtftk get_5p_3p_coords -p 10 2>&1 | grep -c "unstranded"`
+      [ "$result" -eq 1 ]
+    }
     
     
     
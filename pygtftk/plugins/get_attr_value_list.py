@@ -73,11 +73,12 @@ def get_attr_value_list(
 
     if not count:
         for akey in key_name.split(","):
-            for i in gtf.get_attr_value_list(akey):
-                if print_key_name:
-                    outputfile.write(akey + separator + i + "\n")
-                else:
-                    outputfile.write(i + "\n")
+            if print_key_name:
+                prefix = akey + separator
+            else:
+                prefix = ""
+            outputfile.write("".join([prefix + i + "\n"
+                                      for i in gtf.get_attr_value_list(akey)]))
         gc.disable()
         close_properly(outputfile, inputfile)
 
@@ -86,11 +87,13 @@ def get_attr_value_list(
             separator = "\t"
 
         for akey in key_name.split(","):
-            for i in gtf.get_attr_value_list(akey, count=True):
-                if print_key_name:
-                    outputfile.write(akey + separator + i[0] + separator + i[1] + "\n")
-                else:
-                    outputfile.write(i[0] + separator + i[1] + "\n")
+            if print_key_name:
+                prefix = akey + separator
+            else:
+                prefix = ""
+            outputfile.write("".join([prefix + i[0] + separator + i[1] + "\n"
+                                      for i in gtf.get_attr_value_list(akey,
+                                                                       count=True)]))
         gc.disable()
         close_properly(outputfile, inputfile)
 
@@ -3,13 +3,16 @@
  Get transcripts sequences in a flexible fasta format from a GTF file.
 """
 import argparse
+import io
+import mmap
 import os
-import re
 import shutil
 import sys
+from itertools import islice
 
 import gc
 
+import pygtftk.utils
 from pygtftk import arg_formatter
 from pygtftk.arg_formatter import globbedFileList
 from pygtftk.cmd_object import CmdObject
@@ -104,6 +107,107 @@ def make_parser():
     return parser
 
 
+def _advise_sequential(fd):
+    """Tell the kernel that file descriptor fd will be read sequentially
+    (larger readahead). No-op where posix_fadvise is not available."""
+
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _append_file(src, dest):
+    """Append the content of file object src to file object dest. The copy
+    is performed by the kernel (os.sendfile) when possible."""
+
+    dest.flush()
+    offset = 0
+
+    try:
+        src_fd = src.fileno()
+        dest_fd = dest.fileno()
+        _advise_sequential(src_fd)
+        size = os.fstat(src_fd).st_size
+        while offset < size:
+            sent = os.sendfile(dest_fd, src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        if offset:
+            raise
+        shutil.copyfileobj(src, dest, 1024 * 1024 * 100)
+
+
+def _get_fasta_chrom_list(fasta_file):
+    """Return the list of sequence names (header lines without '>') found
+    in a fasta file. The file is memory-mapped and scanned for '\\n>'."""
+
+    with open(fasta_file, "rb") as fasta:
+        _advise_sequential(fasta.fileno())
+        try:
+            fasta_mm = mmap.mmap(fasta.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return []
+
+    chrom_list = []
+
+    with fasta_mm:
+        if hasattr(fasta_mm, "madvise"):
+            fasta_mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        if fasta_mm[:1] == b">":
+            pos = 0
+        else:
+            pos = fasta_mm.find(b"\n>")
+            if pos != -1:
+                pos += 1
+
+        while pos != -1:
+            end = fasta_mm.find(b"\n", pos)
+            if end == -1:
+                end = len(fasta_mm)
+            chrom_list.append(fasta_mm[pos + 1:end].rstrip(b"\r").decode())
+            pos = fasta_mm.find(b"\n>", end)
+            if pos != -1:
+                pos += 1
+
+    return chrom_list
+
+
+def _del_version(an_id):
+    """Remove the version number (e.g. '.12') at the end of an identifier."""
+
+    pos = an_id.rfind(".")
+    if pos != -1:
+        version = an_id[pos + 1:]
+        if version and not version.strip("0123456789"):
+            return an_id[:pos]
+    return an_id
+
+
+def _write_in_chunks(records, outputfile, chunk_size=4 << 20):
+    """Write an iterable of strings to outputfile, grouping them into
+    chunks of about chunk_size characters (one write per chunk)."""
+
+    buf = []
+    buf_size = 0
+
+    for rec in records:
+        buf.append(rec)
+        buf_size += len(rec)
+        if buf_size >= chunk_size:
+            outputfile.write("".join(buf))
+            buf = []
+            buf_size = 0
+
+    if buf:
+        outputfile.write("".join(buf))
+
+
 def get_tx_seq(inputfile=None,
                outputfile=None,
                genome=None,
@@ -124,8 +228,6 @@ def get_tx_seq(inputfile=None,
     #  Check chromosomes in fasta file
     # -----------------------------------------------------------
 
-    genome_chr_list = []
-
     message("%d fasta files found." % len(genome))
 
     as_gz_ext = [True for x in genome if x.name.endswith(".gz")]
@@ -137,10 +239,7 @@ def get_tx_seq(inputfile=None,
         message("Checking fasta file chromosome list")
         genome = genome[0]
         with genome as genome_file:
-            for i in genome_file:
-                if i.startswith(">"):
-                    i = i.rstrip("\n")
-                    genome_chr_list += [i[1:]]
+            genome_chr_list = _get_fasta_chrom_list(genome_file.name)
     else:
         message("Merging fasta files")
         tmp_genome = make_tmp_file(prefix="genome", suffix=".fa")
@@ -148,15 +247,12 @@ def get_tx_seq(inputfile=None,
             for curr_file in genome:
                 message("Merging %s" % curr_file.name)
                 with curr_file as cf:
-                    shutil.copyfileobj(cf, tg, 1024 * 1024 * 100)
+                    _append_file(cf, tg)
 
         message("Checking fasta file chromosome list")
         genome = open(tmp_genome.name, "r")
         with genome as genome_file:
-            for i in genome_file:
-                if i.startswith(">"):
-                    i = i.rstrip("\n")
-                    genome_chr_list += [i[1:]]
+            genome_chr_list = _get_fasta_chrom_list(genome_file.name)
 
     rev_comp = not no_rev_comp
 
@@ -167,34 +263,46 @@ def get_tx_seq(inputfile=None,
     # -----------------------------------------------------------
 
     gtf = GTF(inputfile)
-    nb_tx_before = gtf.extract_data("transcript_id",
-                                    as_list=True,
-                                    no_na=True,
-                                    nr=True)
+    tx_before = gtf.extract_data("transcript_id",
+                                 as_list=True,
+                                 no_na=True,
+                                 nr=True)
+    nb_tx_before = len(tx_before)
+
+    if not pygtftk.utils.VERBOSITY:
+        # Transcript ids are only used to report the missing ones.
+        tx_before = None
 
     # -----------------------------------------------------------
     #  Select genes falling in chrom defined in the fasta file
     # -----------------------------------------------------------
 
-    message("Chromosomes in gtf file: " + ",".join(gtf.get_chroms(nr=True)))
+    # get_chroms() scans the whole GTF. Only call it if the
+    # message is to be displayed.
+    if pygtftk.utils.VERBOSITY:
+        message("Chromosomes in gtf file: " + ",".join(gtf.get_chroms(nr=True)))
 
     message("Selecting chromosome defined in the fasta file")
 
     gtf = gtf.select_by_key(key="seqid",
                             value=",".join(genome_chr_list))
 
-    message("Chromosomes in gtf file: " + ",".join(gtf.get_chroms(nr=True)))
+    if pygtftk.utils.VERBOSITY:
+        message("Chromosomes in gtf file: " + ",".join(gtf.get_chroms(nr=True)))
 
     if len(gtf) == 0:
         message("No genes were found on chromosomes defined in fasta file.",
                 type="ERROR")
 
-    nb_tx_after = gtf.extract_data("transcript_id",
-                                   as_list=True,
-                                   no_na=True,
-                                   nr=True)
-    if len(nb_tx_after) != len(nb_tx_before):
-        diff = list(set(nb_tx_before) - set(nb_tx_after))
+    tx_after = gtf.extract_data("transcript_id",
+                                as_list=True,
+                                no_na=True,
+                                nr=True)
+
+    if len(tx_after) != nb_tx_before and tx_before is not None:
+        tx_after = set(tx_after)
+        # Only the first ids are displayed.
+        diff = list(islice((x for x in tx_before if x not in tx_after), 100))
         message("Some transcripts had"
                 " no corresponding chromosome"
                 " in the fasta file: " + ",".join(diff)[0:100] + "...")
@@ -210,46 +318,51 @@ def get_tx_seq(inputfile=None,
     if sleuth_format:
 
         tx_biotype = tx_gtf.extract_data("transcript_id,transcript_biotype",
-                                         as_dict_of_lists=True, hide_undef=False)
+                                         as_dict_of_values=True, hide_undef=False)
         gn_biotype = tx_gtf.extract_data("gene_id,gene_biotype",
-                                         as_dict_of_lists=True, hide_undef=False)
+                                         as_dict_of_values=True, hide_undef=False)
+
+        sleuth_template = ">%s chromosome:%s:%s:%s:%s:1 gene:%s " \
+                          "gene_biotype:%s transcript_biotype:%s\n%s\n"
 
-        for i in fasta_seq:
-            gene_id = i.gene_id
-            transcript_id = i.transcript_id
-            chrom = i.chrom
+        def sleuth_records():
+            for i in fasta_seq:
+                gene_id = i.gene_id
+                transcript_id = i.transcript_id
+                chrom = i.chrom
 
-            gn_bio = gn_biotype[i.gene_id][0]
-            tx_bio = tx_biotype[i.transcript_id][0]
+                gn_bio = gn_biotype[i.gene_id]
+                tx_bio = tx_biotype[i.transcript_id]
 
-            if delete_version:
-                transcript_id = re.sub('\.[0-9]+$', '', transcript_id)
-                gene_id = re.sub('\.[0-9]+$', '', gene_id)
-            if del_chr:
-                chrom = chrom.replace('chr', '')
+                if delete_version:
+                    transcript_id = _del_version(transcript_id)
+                    gene_id = _del_version(gene_id)
+                if del_chr:
+                    chrom = chrom.replace('chr', '')
 
-            header = " ".join([transcript_id,
-                               ":".join(["chromosome",
+                yield sleuth_template % (transcript_id,
                                          assembly, chrom,
-                                         str(i.start), str(i.end), "1"]),
-                               "gene:" + gene_id,
-                               "gene_biotype:" + gn_bio,
-                               "transcript_biotype:" + tx_bio])
+                                         i.start, i.end,
+                                         gene_id,
+                                         gn_bio,
+                                         tx_bio,
+                                         i.sequence)
 
-            outputfile.write(">" + header + "\n")
-            outputfile.write(i.sequence + "\n")
+        _write_in_chunks(sleuth_records(), outputfile)
     else:
         tx_info = tx_gtf.extract_data("transcript_id," + label,
                                       as_dict_of_lists=True, hide_undef=False)
-        for i in fasta_seq:
-            if not explicit:
-                header = separator.join(tx_info[i.transcript_id])
-            else:
-                header = [str(x[0]) + "=" + x[1]
-                          for x in zip(label.split(","), tx_info[i.transcript_id])]
-                header = separator.join(header)
-            outputfile.write(">" + header + "\n")
-            outputfile.write(i.sequence + "\n")
+        # The header layout only depends on the labels.
+        label_list = [x.replace("%", "%%") for x in label.split(",")]
+        if explicit:
+            header_template = [x + "=%s" for x in label_list]
+        else:
+            header_template = ["%s"] * len(label_list)
+        record_template = ">" + separator.replace("%", "%%").join(header_template) + "\n%s\n"
+
+        _write_in_chunks((record_template % (tuple(tx_info[i.transcript_id]) +
+                                             (i.sequence,))
+                          for i in fasta_seq), outputfile)
 
     gc.disable()
     close_properly(outputfile, inputfile)
@@ -149,6 +149,18 @@ else:
      result=`gtftk intronic -i simple.gtf -b | cut -f3 | perl -npe  's/\\n/,/'`
       [ "$result" = "56,70,73,70,73,41,27,32,32,219," ]
     }
+
+    #intronic: check intron numbering on minus strand
+    @test "intronic_5" {
+     result=`gtftk intronic -i simple.gtf -b | grep G0006T001 | cut -f2,5| perl -npe 's/\\t/|/g; s/\\n/,/g'`
+      [ "$result" = "25|2,30|1," ]
+    }
+
+    #intronic: check intron numbering on minus strand (-w)
+    @test "intronic_6" {
+     result=`gtftk intronic -i simple.gtf -b -w | grep G0006T001 | cut -f4| perl -npe  's/\\n/,/'`
+      [ "$result" = "intron|G0006|G0006T001|2,intron|G0006|G0006T001|1," ]
+    }
     
     '''
 
@@ -241,6 +241,24 @@ else:
      result=`gtftk get_example |  gtftk join_attr -j simple.join_with_dup -k gene_id -n bla -t gene  -V 2 | gtftk select_by_regexp -k bla -r "0\."| gtftk tabulate -k bla -Hun | perl -npe 's/\\n/|/'`
       [ "$result" = "0.2322|0.2|0.999|0.5555|0.1|" ]
     }
+
+    #join_attr: a file without value is rejected
+    @test "join_attr_12" {
+     result=`printf 'G0001\\nG0002\\t0.1\\n' > simple_bad.join; gtftk join_attr -i simple.gtf  -j simple_bad.join -k gene_id -n bla 2>&1 | grep -c "contains 2 fields"`
+      [ "$result" -eq 1 ]
+    }
+
+    #join_attr: a matrix line longer than the header is rejected
+    @test "join_attr_13" {
+     result=`printf 'gene\\tS1\\tS2\\nG0001\\t1\\t2\\nG0002\\t3\\t4\\t5\\n' > simple_bad.join_mat; gtftk join_attr -i simple.gtf  -j simple_bad.join_mat -k gene_id -m 2>&1 | grep -c "differ from the header"`
+      [ "$result" -eq 1 ]
+    }
+
+    #join_attr: columns with the same name are merged
+    @test "join_attr_14" {
+     result=`printf 'gene\\tS1\\tS1\\nG0001\\t1\\t2\\n' > simple_dup.join_mat; gtftk join_attr -i simple.gtf  -j simple_dup.join_mat -k gene_id -m -t gene | grep -c 'S1 "1|2"'`
+      [ "$result" -eq 1 ]
+    }
         
 
     
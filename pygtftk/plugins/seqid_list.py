@@ -51,8 +51,8 @@ def seqid_list(
     Select the seqid/chromosomes.
     """
 
-    for i in GTF(inputfile, check_ensembl_format=False).get_chroms(nr=True):
-        outputfile.write(str(i) + separator)
+    chroms = GTF(inputfile, check_ensembl_format=False).get_chroms(nr=True)
+    outputfile.write("".join(str(i) + separator for i in chroms))
 
     gc.disable()
     close_properly(outputfile, inputfile)
@@ -4,11 +4,15 @@
 """
 
 import argparse
+import csv
 import os
 import sys
 
 import gc
+import numpy as np
+import pandas as pd
 
+import pygtftk.utils
 from pygtftk import arg_formatter
 from pygtftk.arg_formatter import CheckChromFile
 from pygtftk.cmd_object import CmdObject
@@ -16,9 +20,13 @@ from pygtftk.gtf_interface import GTF
 from pygtftk.utils import GTFtkError
 from pygtftk.utils import chrom_info_as_dict
 from pygtftk.utils import close_properly
+from pygtftk.utils import make_tmp_file
 
 __updated__ = "2018-01-20"
 
+# Number of GTF lines loaded at once.
+CHUNK_SIZE = 100000
+
 __notes__ = """
  -- By default shift is not strand specific. Meaning that if -\shift-value is set to 10, all coordinates will be moved 10 bases in 5' direction relative to the forward/watson/plus/top strand.
  -- Use a negative value to shift in 3' direction, a positive value to shift in 5' direction.
@@ -74,6 +82,57 @@ def make_parser():
     return parser
 
 
+def _shift_chunk(gtf_df,
+                 chrom_len=None,
+                 shift_value=None,
+                 stranded=False,
+                 allow_outside=False):
+    """Shift the start and end columns of a GTF DataFrame (columns 4 and 5,
+    as strings). Returns the DataFrame with the retained lines.
+    """
+
+    clen = gtf_df[0].map(chrom_len).to_numpy(dtype=np.int64)
+
+    start = gtf_df[3].to_numpy(dtype=np.int64)
+    end = gtf_df[4].to_numpy(dtype=np.int64)
+
+    if stranded:
+        delta = np.where(gtf_df[6].to_numpy() == "-", -shift_value, shift_value)
+    else:
+        delta = shift_value
+
+    new_start = start + delta
+    new_end = end + delta
+
+    if not allow_outside:
+        size = end - start + 1
+
+        # Feature is going outside genome in left direction
+        left = new_start < 1
+        new_start = np.where(left, 1, new_start)
+        new_end = np.where(left, size, new_end)
+
+        # Feature is going outside genome in right direction
+        right = new_end > clen
+        new_end = np.where(right, clen, new_end)
+        new_start = np.where(right, new_end - size + 1, new_start)
+
+        keep = None
+    else:
+        # Features that are totally outside the genome are discarded.
+        keep = (new_end >= 1) & (new_start <= clen)
+        new_start = np.maximum(new_start, 1)
+        new_end = np.minimum(new_end, clen)
+
+    gtf_df[3] = new_start.astype(str)
+    gtf_df[4] = new_end.astype(str)
+
+    if keep is not None:
+        gtf_df = gtf_df[keep]
+
+    return gtf_df
+
+
 def shift(inputfile=None,
           outputfile=None,
           shift_value=None,
@@ -88,49 +147,51 @@ def shift(inputfile=None,
     chrom_list_gtf = gtf.get_chroms(nr=True)
     chrom_info = chrom_info_as_dict(chrom_info)
 
-    for chr in chrom_list_gtf:
-        if chr not in chrom_info:
-            raise GTFtkError("Chromosome " + chr + " was not found in chrom-info file.")
-
-    for i in gtf:
-        size = i.end - i.start + 1
-        if not stranded:
-            new_start = i.start + shift_value
-            new_end = i.end + shift_value
-        else:
-            if i.strand == "-":
-                new_start = i.start - shift_value
-                new_end = i.end - shift_value
-            else:
-                new_start = i.start + shift_value
-                new_end = i.end + shift_value
-
-        # Feature is going outside genome in left direction
-        if not allow_outside:
-            if new_start < 1:
-                new_start = 1
-                new_end = size
-
-            # Feature is going outside genome in right direction
-            if new_end > int(chrom_info[i.chrom]):
-                new_end = int(chrom_info[i.chrom])
-                new_start = new_end - size + 1
-        else:
-            if new_start < 1:
-                new_start = 1
-                if new_end < 1:
-                    new_end = None
-
-            # Feature is going outside genome in right direction
-            if new_end > int(chrom_info[i.chrom]):
-                new_end = int(chrom_info[i.chrom])
-                if new_start > int(chrom_info[i.chrom]):
-                    new_start = None
-
-        if new_start is not None and new_end is not None:
-            i.start = new_start
-            i.end = new_end
-            i.write(outputfile)
+    missing_chroms = set(chrom_list_gtf).difference(chrom_info)
+
+    if missing_chroms:
+        raise GTFtkError("Chromosome(s) " + ",".join(sorted(missing_chroms)) +
+                         " not found in chrom-info file.")
+
+    if not len(gtf):
+        close_properly(outputfile, inputfile)
+        return
+
+    # The GTF is written by libgtftk and shifted using numpy
+    # (columns 4 and 5). Other columns are left untouched.
+    tmp_file = make_tmp_file(prefix="shift", suffix=".gtf")
+    gtf.write(tmp_file)
+
+    # Chromosome names are written with a 'chr' prefix if requested.
+    if pygtftk.utils.ADD_CHR == 1:
+        chrom_prefix = "chr"
+    else:
+        chrom_prefix = ""
+
+    chrom_len = {chrom_prefix + x: int(chrom_info[x]) for x in chrom_list_gtf}
+
+    # The file is processed by chunks of lines to limit memory usage.
+    gtf_reader = pd.read_csv(tmp_file.name,
+                             sep="\t",
+                             header=None,
+                             dtype=str,
+                             na_filter=False,
+                             quoting=csv.QUOTE_NONE,
+                             engine="c",
+                             chunksize=CHUNK_SIZE)
+
+    for gtf_df in gtf_reader:
+        gtf_df = _shift_chunk(gtf_df,
+                              chrom_len=chrom_len,
+                              shift_value=shift_value,
+                              stranded=stranded,
+                              allow_outside=allow_outside)
+
+        gtf_df.to_csv(outputfile,
+                      sep="\t",
+                      header=False,
+                      index=False,
+                      quoting=csv.QUOTE_NONE)
 
     gc.disable()
     close_properly(outputfile, inputfile)
@@ -193,6 +254,60 @@ else:
       [ "$result" -eq 128 ]
     }
 
+    #shift: stranded, minus strand
+    @test "shift_6" {
+     result=`gtftk shift -i simple.gtf -s 10 -d -c simple.chromInfo | grep -w G0003 | awk '$3=="gene"' | cut -f 4,5 | perl -npe 's/\\t/,/'`
+      [ "$result" = "40,51" ]
+    }
+
+    #shift: feature kept inside chromosome start
+    @test "shift_7" {
+     result=`gtftk shift -i simple.gtf -s -10 -c simple.chromInfo | grep -w G0009 | awk '$3=="gene"' | cut -f 4,5 | perl -npe 's/\\t/,/'`
+      [ "$result" = "1,12" ]
+    }
+
+    #shift: feature kept inside chromosome end
+    @test "shift_8" {
+     result=`gtftk shift -i simple.gtf -s 100 -c simple.chromInfo | grep -w G0008 | awk '$3=="gene"' | cut -f 4,5 | perl -npe 's/\\t/,/'`
+      [ "$result" = "288,300" ]
+    }
+
+    #shift: allow outside, clipped at chromosome start
+    @test "shift_9" {
+     result=`gtftk shift -i simple.gtf -s -10 -a -c simple.chromInfo | grep -w G0009 | awk '$3=="gene"' | cut -f 4,5 | perl -npe 's/\\t/,/'`
+      [ "$result" = "1,4" ]
+    }
+
+    #shift: allow outside, clipped at chromosome end
+    @test "shift_10" {
+     result=`gtftk shift -i simple.gtf -s 90 -a -c simple.chromInfo | grep -w G0008 | awk '$3=="gene"' | cut -f 4,5 | perl -npe 's/\\t/,/'`
+      [ "$result" = "300,300" ]
+    }
+
+    #shift: allow outside, dropped at chromosome start
+    @test "shift_11" {
+     result=`gtftk shift -i simple.gtf -s -10 -a -c simple.chromInfo | wc -l`
+      [ "$result" -eq 68 ]
+    }
+
+    #shift: allow outside, dropped at chromosome end
+    @test "shift_12" {
+     result=`gtftk shift -i simple.gtf -s 90 -a -c simple.chromInfo | wc -l`
+      [ "$result" -eq 68 ]
+    }
+
+    #shift: allow outside, all features dropped
+    @test "shift_13" {
+     result=`gtftk shift -i simple.gtf -s -1000 -a -c simple.chromInfo | wc -l`
+      [ "$result" -eq 0 ]
+    }
+
+    #shift: allow outside, all features dropped
+    @test "shift_14" {
+     result=`gtftk shift -i simple.gtf -s 1000 -a -c simple.chromInfo | wc -l`
+      [ "$result" -eq 0 ]
+    }
+
 
     '''
 
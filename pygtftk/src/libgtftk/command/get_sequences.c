@@ -7,6 +7,7 @@
 
 #include "libgtftk.h"
 #include <sys/stat.h>
+#include <sys/mman.h>
 
 extern int split_ip(char ***tab, char *s, char *delim);
 extern int compare_row_list(const void *p1, const void *p2);
@@ -89,6 +90,68 @@ void get_chunk(char *ret, FILE *fasta_file, long seqpos, int L, int N, int p, ch
 	}
 }
 
+/*
+ * Same as fgets but reads from a memory mapped file. pos is the current
+ * position in the file (the equivalent of ftell) and is updated.
+ */
+static char *mem_gets(char *s, int size, const char *map, long map_size, long *pos) {
+	int i = 0;
+
+	if ((*pos < 0) || (*pos >= map_size)) return NULL;
+	while ((i < size - 1) && (*pos < map_size)) {
+		s[i] = map[(*pos)++];
+		if (s[i++] == '\n') break;
+	}
+	s[i] = 0;
+	return s;
+}
+
+/*
+ * Same as get_chunk but reads the sequence from a memory mapped fasta file
+ * instead of a FILE stream (no seek/read system call per chunk).
+ */
+void get_chunk_mm(char *ret, const char *map, long map_size, long seqpos, int L, int N, int p, char strand) {
+	int sr, sc, er, ec, reste_row = N, toget, reste_row_file, eof;
+	long pos = seqpos;
+
+	sr = (p - 1) / L;
+	sc = p - sr * L - 1;
+	er = (p + N - 2) / L;
+	ec = p + N - 2 - er * L;
+	if (strand == '+') {
+		pos += sr * (L + 1) + sc;
+		reste_row_file = L - sc;
+		do {
+			toget = MIN(reste_row, reste_row_file);
+			eof = (mem_gets(ret + N - reste_row, toget + 1, map, map_size, &pos) == NULL);
+			if (*(ret + strlen(ret) - 1) == '\n') *(ret + strlen(ret) - 1) = 0;
+			reste_row -= toget;
+			reste_row_file -= toget;
+			if (!reste_row_file) {
+				if (pos < map_size) pos++;
+				reste_row_file = L;
+			}
+		} while (reste_row && !eof);
+	}
+	else {
+		pos += er * (L + 1) + ec;
+		reste_row_file = ec + 1;
+		do {
+			toget = MIN(reste_row, reste_row_file);
+			pos += 1 - toget;
+			eof = (mem_gets(ret + N - reste_row, toget + 1, map, map_size, &pos) == NULL);
+			revcomp(ret + N - reste_row, toget);
+			reste_row -= toget;
+			reste_row_file -= toget;
+			pos += -toget - 1;
+			if (!reste_row_file) {
+				pos--;
+				reste_row_file = L;
+			}
+		} while (reste_row && !eof);
+	}
+}
+
 SEQFRAG *make_seqfrag(char *seqid, int start, int end, char strand, char *style, char *color) {
 	SEQFRAG *sf = (SEQFRAG *)calloc(1, sizeof(SEQFRAG));
 
@@ -302,8 +365,10 @@ SEQUENCES *get_sequences(GTF_DATA *gtf_data, char *genome_file, int intron, int
 	ENTRY item, *e;
 	SEQFRAG *seqfrag;
 
-	char **token, *feature, *attr;
+	char **token, *feature, *attr, *fmap = NULL;
 	int i, n, nb_exon = 0, tr_len, maxLineSize = 0, pcdna;
+	long fmap_size = 0;
+	struct stat fstat_buf;
 	ROW_LIST *test_row_list = calloc(1, sizeof(ROW_LIST)), **find_row_list;
 	GTF_ROW *row;
 	INDEX_ID *trid_index_id;
@@ -351,6 +416,20 @@ SEQUENCES *get_sequences(GTF_DATA *gtf_data, char *genome_file, int intron, int
 		}
 		fclose(ffi);
 
+		/*
+		 * Map the genome file in memory. Sequence chunks are then copied
+		 * from the map without any seek/read. Falls back to the FILE stream
+		 * if the file can't be mapped.
+		 */
+		if (!fstat(fileno(ff), &fstat_buf) && (fstat_buf.st_size > 0)) {
+			fmap_size = (long)fstat_buf.st_size;
+			fmap = (char *)mmap(NULL, fmap_size, PROT_READ, MAP_PRIVATE, fileno(ff), 0);
+			if (fmap == MAP_FAILED)
+				fmap = NULL;
+			else
+				madvise(fmap, fmap_size, MADV_RANDOM);
+		}
+
 		/*
 		 * The main loop on GTF rows
 		 */
@@ -463,7 +542,10 @@ SEQUENCES *get_sequences(GTF_DATA *gtf_data, char *genome_file, int intron, int
 						if (intron) {
 							tr_len = atoi(row->field[4]) - atoi(row->field[3]) + 1;
 							sequence->sequence = (char *)calloc(tr_len + 1, sizeof(char));
-							get_chunk(sequence->sequence, ff, *(long *)(e->data), maxLineSize, tr_len, atoi(row->field[3]), rc ? *(row->field[6]) : '+');
+							if (fmap != NULL)
+								get_chunk_mm(sequence->sequence, fmap, fmap_size, *(long *)(e->data), maxLineSize, tr_len, atoi(row->field[3]), rc ? *(row->field[6]) : '+');
+							else
+								get_chunk(sequence->sequence, ff, *(long *)(e->data), maxLineSize, tr_len, atoi(row->field[3]), rc ? *(row->field[6]) : '+');
 						}
 
 						/*
@@ -477,7 +559,10 @@ SEQUENCES *get_sequences(GTF_DATA *gtf_data, char *genome_file, int intron, int
 							sequence->sequence = (char *)calloc(tr_len + 1, sizeof(char));
 							pcdna = 0;
 							for (i = 0; i < nb_exon; i++) {
-								get_chunk(sequence->sequence + pcdna, ff, *(long *)(e->data), maxLineSize, seqfrag[i].end - seqfrag[i].start + 1, seqfrag[i].start, rc ? seqfrag[i].strand : '+');
+								if (fmap != NULL)
+									get_chunk_mm(sequence->sequence + pcdna, fmap, fmap_size, *(long *)(e->data), maxLineSize, seqfrag[i].end - seqfrag[i].start + 1, seqfrag[i].start, rc ? seqfrag[i].strand : '+');
+								else
+									get_chunk(sequence->sequence + pcdna, ff, *(long *)(e->data), maxLineSize, seqfrag[i].end - seqfrag[i].start + 1, seqfrag[i].start, rc ? seqfrag[i].strand : '+');
 								pcdna += seqfrag[i].end - seqfrag[i].start + 1;
 							}
 						}
@@ -631,6 +716,7 @@ SEQUENCES *get_sequences(GTF_DATA *gtf_data, char *genome_file, int intron, int
 				}
 			}
 		}
+		if (fmap != NULL) munmap(fmap, fmap_size);
 	}
 	return ret;
 }
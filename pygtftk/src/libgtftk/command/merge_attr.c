@@ -25,16 +25,13 @@ extern int nb_column;
 
 __attribute__ ((visibility ("default")))
 GTF_DATA *merge_attr(GTF_DATA *gtf_data, char *features, char *keys, char *dest_key, char *sep) {
-	int i, j, k, c, nb_attr, new_size, ok;
+	int i, j, k, c, nb_attr, ok;
 	int nb_requested_key = 0;
-	char **key_list;
-	char *none = strdup(".");
-	char *new_buffer;
-
-	typedef struct hit {
-		char *key;
-		char *value;
-	} hit;
+	int *key_col;
+	char **key_list, **values;
+	char *none = ".";
+	char *new_buffer, *p;
+	size_t new_size, buffer_size = 256, sep_len = strlen(sep);
 
 	/*
 	 * reserve memory for the GTF_DATA structure to return
@@ -44,55 +41,71 @@ GTF_DATA *merge_attr(GTF_DATA *gtf_data, char *features, char *keys, char *dest_
 	GTF_ROW *row;
 	ATTRIBUTE *pattr;
 	nb_requested_key = split_ip(&key_list, strdup(keys), ",");
-	hit *hits = calloc(nb_requested_key, sizeof(hit));
+	values = (char **)calloc(nb_requested_key, sizeof(char *));
 
-	for (i = 0; i < ret->size; i++)	{
-		new_size = 1;
-		new_buffer = (char *)calloc(1, sizeof(char));
-		for (k = 0; k < nb_requested_key; k++)	{
-			hits[k].key = key_list[k];
-			hits[k].value = none;
-		}
+	/*
+	 * the column used when a key is not found in the attributes is
+	 * resolved once for all rows (-1 if the key is not a column name)
+	 */
+	key_col = (int *)calloc(nb_requested_key, sizeof(int));
+	for (k = 0; k < nb_requested_key; k++) {
+		key_col[k] = -1;
+		for (c = 0; c < nb_column; c++)
+			if (!strcmp(column[c]->name, key_list[k])) {
+				key_col[k] = c;
+				break;
+			}
+	}
+
+	/*
+	 * the merged value is built in a scratch buffer reused for every row
+	 * (add_attribute makes its own copy)
+	 */
+	new_buffer = (char *)malloc(buffer_size);
 
+	for (i = 0; i < ret->size; i++)	{
 		row = ret->data[i];
 		ok = (*features == '*');
 		if (!ok) ok = (strstr(features, row->field[2]) != NULL);
 		if (ok)	{
 			nb_attr = row->attributes.nb;
+			new_size = 1;
 			for (k = 0; k < nb_requested_key; k++)	{
+				values[k] = none;
 				for (j = 0; j < nb_attr; j++) {
-					//pattr = row->attributes.attr[j];
 					pattr = row->attributes.attr + j;
 					if (strcmp(key_list[k], pattr->key) == 0) {
-						hits[k].value = strdup(pattr->value);
+						values[k] = pattr->value;
 						break;
 					}
 				}
-				if (strcmp(hits[k].value, ".") == 0)	{
-					for (c = 0; c < nb_column; c++)	{
-						if(!strcmp(column[c]->name, hits[k].key)) {
-						    hits[k].value = strdup(row->field[c]);
-						    break;
-						}
-					}
-				}
-				if (k == 0) {
-					new_size += strlen(hits[k].value);
-					new_buffer = (char *)realloc(new_buffer, new_size);
-					strcat(new_buffer, hits[k].value);
-				}
-				else {
-					new_size += strlen(hits[k].value) + strlen(sep);
-					new_buffer = (char *)realloc(new_buffer, new_size);
-					strcat(new_buffer, sep);
-					strcat(new_buffer, hits[k].value);
+				if ((strcmp(values[k], ".") == 0) && (key_col[k] != -1))
+					values[k] = row->field[key_col[k]];
+				new_size += strlen(values[k]);
+				if (k > 0) new_size += sep_len;
+			}
+			if (new_size > buffer_size) {
+				buffer_size = new_size;
+				new_buffer = (char *)realloc(new_buffer, buffer_size);
+			}
+			p = new_buffer;
+			for (k = 0; k < nb_requested_key; k++)	{
+				if (k > 0) {
+					memcpy(p, sep, sep_len);
+					p += sep_len;
 				}
+				c = strlen(values[k]);
+				memcpy(p, values[k], c);
+				p += c;
 			}
+			*p = 0;
 			add_attribute(row, dest_key, new_buffer);
-			free(new_buffer);
 		}
-		//update_attribute_table(row);
 	}
 
+	free(new_buffer);
+	free(key_col);
+	free(values);
+
 	return ret;
 }
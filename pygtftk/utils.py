@@ -105,7 +105,8 @@ def mkdir_p(path):
 def make_tmp_file(prefix='tmp',
                   suffix='',
                   store=True,
-                  dir=None):
+                  dir=None,
+                  buffering=-1):
     """
     This function should be call to create a temporary file as all files
     declared in TMP_FILE_LIST will be remove upon command exit.
@@ -115,6 +116,7 @@ def make_tmp_file(prefix='tmp',
     :param store: declare the temporary file in utils.TMP_FILE_LIST. In pygtftk, \
     the deletion of these files upon exit is controled through -k.
     :param dir: a target directory.
+    :param buffering: the buffer size (in bytes) of the file object (default to the system default).
 
     :Example:
 
@@ -147,6 +149,7 @@ def make_tmp_file(prefix='tmp',
 
     tmp_file = NamedTemporaryFile(delete=False,
                                   mode='w',
+                                  buffering=buffering,
                                   prefix=prefix + "_pygtftk_",
                                   suffix=suffix,
                                   dir=dir_target)